@@ -1,19 +1,35 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import json
 import os
 import time
 from datetime import datetime
 import re
+import sys
 import io
 import hashlib
-from typing import Dict, List, Any, Tuple, Optional
+import gzip
+import gc
+import importlib.util
+import html
+import unicodedata
+import tempfile
+import threading
+import weakref
+import queue
+import sqlite3
+import asyncio
+from collections import Counter, OrderedDict
+from string import Template
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Tuple, Optional, NamedTuple, Iterator
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import optional dependencies with error handling
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
@@ -30,35 +46,65 @@ try:
 except ImportError:
     DOCX_AVAILABLE = False
 
+# openpyxl and reportlab are only needed when a report is exported, so the report
+# generators import them on first use; startup only checks that they are installed
+EXCEL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+PDF_AVAILABLE = importlib.util.find_spec('reportlab') is not None
+
 try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    from openpyxl.utils.dataframe import dataframe_to_rows
-    EXCEL_AVAILABLE = True
+    import PyPDF2
+    import pdfplumber
+    PDF_EXTRACT_AVAILABLE = True
 except ImportError:
-    EXCEL_AVAILABLE = False
+    PDF_EXTRACT_AVAILABLE = False
 
 try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.colors import Color, red, orange, yellow, lightgrey, black
-    from reportlab.lib.units import inch
-    from reportlab.platypus.flowables import KeepTogether
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-    import os
-    PDF_AVAILABLE = True
+    try:
+        import pymupdf as fitz  # PyMuPDF >= 1.24 module name
+    except ImportError:
+        import fitz
+    FITZ_AVAILABLE = True
 except ImportError:
-    PDF_AVAILABLE = False
+    FITZ_AVAILABLE = False
 
 try:
-    import PyPDF2
-    import pdfplumber
-    PDF_EXTRACT_AVAILABLE = True
+    import ahocorasick  # pyahocorasick - C Aho-Corasick automaton for the keyword pre-scan
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    PDF_EXTRACT_AVAILABLE = False
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import numpy as np  # Vectorized character statistics over UTF-32 codepoints
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson  # Rust JSON parser/serializer for model replies and result records
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# JSON helpers used on the per-reply and per-record paths; both backends raise a
+# ValueError subclass on malformed input and keep non-ASCII text as-is
+if ORJSON_AVAILABLE:
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def json_bytes(obj, sort_keys=False):
+        """UTF-8 JSON bytes for files, uploads and hashing - no str round trip"""
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False)
+
+    def json_bytes(obj, sort_keys=False):
+        """UTF-8 JSON bytes for files, uploads and hashing - no str round trip"""
+        return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, default=str).encode('utf-8')
 
 # Mistral OCR support - ENHANCED VERSION
 try:
@@ -75,10 +121,98 @@ OCR_ERROR_MESSAGE = ""
 MAX_CHARS_PER_CHUNK = 3000  # Smaller chunks for better analysis
 OVERLAP_CHARS = 100  # Reduced overlap
 MAX_TOKENS_OUTPUT = 1500  # Increased output tokens for more violations
-CHUNK_DELAY = 0.5  # Reduced delay for faster analysis
 MAX_RETRIES = 3
+MAX_CONCURRENT_CHUNKS = 4  # Chunks analyzed in parallel (bounded by API rate limits)
+CHUNKS_PER_REQUEST = 4  # Consecutive chunks sent together in one analysis request
+MAX_CONCURRENT_SOLUTIONS = 8  # AI solution requests in flight at once
+SOLUTIONS_PER_REQUEST = 10  # Violations revised together in one OpenAI solution request
+API_REQUESTS_PER_MINUTE = 60  # Per-provider request budget shared by every session and worker (see get_rate_limiter)
+BATCH_WAIT_SECONDS = 120  # How long one batch status check polls before handing control back
+SOLUTION_CACHE_SIZE = 1024  # Generated solutions kept for repeated (text, type, language) violations
+DOC_CACHE_SIZE = 5  # Analyzed uploads kept per session, keyed by content hash
+STREAM_ABORT_CHARS = 400  # Streamed replies that open no JSON object within this many characters are dropped
+PROMPT_VERSION = "1"  # Bump whenever the analysis prompt or models change - invalidates cached chunk analyses
+# The on-disk caches hold confidential script text, so they live in an app-owned directory
+# readable only by the server's user (0o700 dirs, 0o600 files) rather than the shared temp dir
+CACHE_DIR = os.environ.get('SCRIPTZ_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'scriptz')
+CHUNK_CACHE_PATH = os.path.join(CACHE_DIR, 'chunk_cache.sqlite3')
+ANALYSIS_CACHE_DIR = os.path.join(CACHE_DIR, 'analyses')  # Saved upload analyses, one folder per user
+ANALYSIS_CACHE_FILES = 50  # Saved analyses kept per user; the oldest are deleted
+PARTIAL_RESULTS_DIR = os.path.join(CACHE_DIR, 'partial')  # Violations logged by analyses still running
+REPORTS_DIR = os.path.join(CACHE_DIR, 'reports')  # Generated reports the download buttons read from
+ORPHAN_MAX_AGE_SECONDS = 24 * 3600  # Logs and reports left behind by a crashed server are swept after this long
+CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600  # Cached chunk analyses and saved uploads expire this long after being written
+HIGHLIGHT_SHINGLE_SIZE = 16  # Window size for the highlighted PDF paragraph prefilter
+VIOLATIONS_PER_PAGE = 20  # Detailed violation cards per page in the paste view
+
+# Severity lookup used by every result view: (emoji, background, border)
+SEVERITY_META = MappingProxyType({
+    'critical': ('🔴', '#ffebee', '#f44336'),
+    'high': ('🟠', '#fff3e0', '#ff9800'),
+    'medium': ('🟡', '#e3f2fd', '#2196f3'),
+    'low': ('🟢', '#e8f5e9', '#4caf50')
+})
+# Read-only per-field views of SEVERITY_META for single lookups in render loops
+SEVERITY_ICON = MappingProxyType({k: v[0] for k, v in SEVERITY_META.items()})
+SEVERITY_BG = MappingProxyType({k: v[1] for k, v in SEVERITY_META.items()})
+SEVERITY_BORDER = MappingProxyType({k: v[2] for k, v in SEVERITY_META.items()})
+# Severity chart slice colors
+SEVERITY_CHART_COLORS = MappingProxyType({'critical': '#f44336', 'high': '#ff9800', 'medium': '#ffeb3b', 'low': '#9c27b0'})
+# Highlighted-PDF paragraph colors as RGB (background, border); unknown severities use 'low'
+HIGHLIGHT_PDF_COLORS = MappingProxyType({
+    'critical': ((1, 0.9, 0.9), (1, 0, 0)),      # Light red, red border
+    'high': ((1, 0.95, 0.8), (1, 0.5, 0)),       # Light orange, orange border
+    'medium': ((1, 1, 0.9), (1, 1, 0)),          # Light yellow, yellow border
+    'low': ((0.95, 0.9, 1), (0.5, 0, 1))         # Light purple, purple border
+})
+SEVERITY_LABEL = MappingProxyType({k: k.upper() for k in SEVERITY_META})
+
+def streamlit_worker_initializer():
+    """Build a thread-pool initializer that attaches the current script run context
+    so st.* calls and st.cache_data keep working inside worker threads"""
+    ctx = get_script_run_ctx()
+    
+    def attach_context():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+    
+    return attach_context
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` requests per `per` seconds, bursting up to `rate`"""
+    
+    def __init__(self, rate, per=60.0):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.fill_rate
+            time.sleep(delay)
+
+# One budget per provider, replacing fixed sleeps between chunk requests. Streamlit
+# re-executes this script on every rerun, so module globals would give each run and
+# session a budget of its own; st.cache_resource keeps one instance per process
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(provider):
+    """The process-wide RateLimiter for one provider ('mistral' or 'openai')"""
+    return RateLimiter(API_REQUESTS_PER_MINUTE)
 
 # FIXED: Unicode text processing functions - ENHANCED for Bengali preservation
+# Characters safe_unicode_text drops: zero-width space, BOM, zero-width non-joiner and joiner
+_STRIP_CHARS_TABLE = str.maketrans('', '', '\u200b\ufeff\u200c\u200d')
+
 def safe_unicode_text(text):
     """Safely handle Unicode text - PRESERVE Bengali characters exactly - FIXED"""
     if not text:
@@ -91,15 +225,15 @@ def safe_unicode_text(text):
         elif not isinstance(text, str):
             text = str(text)
         
+        # ASCII text has nothing to strip and is already NFC
+        if text.isascii():
+            return text
+        
         # FIXED: DON'T sanitize Unicode characters - keep them exactly as is
-        # Only remove truly problematic characters
-        text = text.replace('\u200b', '')  # Remove zero-width space only
-        text = text.replace('\ufeff', '')  # Remove BOM
-        text = text.replace('\u200c', '')  # Remove zero-width non-joiner (problematic for some systems)
-        text = text.replace('\u200d', '')  # Remove zero-width joiner (problematic for some systems)
+        # Only remove truly problematic characters, in one pass
+        text = text.translate(_STRIP_CHARS_TABLE)
         
         # Normalize Unicode but preserve all characters
-        import unicodedata
         text = unicodedata.normalize('NFC', text)
         
         return text
@@ -112,54 +246,108 @@ def detect_language_fallback(text_sample):
     if not text_sample:
         return "English"
     
-    # Enhanced character range detection
-    bengali_chars = sum(1 for char in text_sample if '\u0980' <= char <= '\u09FF')
-    hindi_chars = sum(1 for char in text_sample if '\u0900' <= char <= '\u097F')
-    tamil_chars = sum(1 for char in text_sample if '\u0B80' <= char <= '\u0BFF')
-    telugu_chars = sum(1 for char in text_sample if '\u0C00' <= char <= '\u0C7F')
-    gujarati_chars = sum(1 for char in text_sample if '\u0A80' <= char <= '\u0AFF')
-    
-    total_chars = len(text_sample)
+    # Each script is exactly one 128-codepoint block, so one codepoint_blocks() tally
+    # counts them all; checked in this priority order
+    blocks = codepoint_blocks(text_sample)
     
     # Lower threshold for detection (5% instead of 10%)
-    threshold = 0.05
-    
-    if bengali_chars > total_chars * threshold:
-        return "Bengali"
-    elif hindi_chars > total_chars * threshold:
-        return "Hindi"
-    elif tamil_chars > total_chars * threshold:
-        return "Tamil"
-    elif telugu_chars > total_chars * threshold:
-        return "Telugu"
-    elif gujarati_chars > total_chars * threshold:
-        return "Gujarati"
-    else:
+    threshold = len(text_sample) * 0.05
+    
+    for language, block in _FALLBACK_SCRIPT_BLOCKS:
+        if blocks[block] > threshold:
+            return language
+    return "English"
+
+# Languages of the 128-codepoint Indic blocks U+0900..U+0D7F, indexed by (codepoint >> 7) - 18.
+# None for scripts shared by several languages (Devanagari: Hindi, Marathi, Nepali...;
+# Gurmukhi), which still need the language detector
+_INDIC_BLOCK_LANGUAGES = (None, 'Bengali', None, 'Gujarati', 'Odia', 'Tamil', 'Telugu', 'Kannada', 'Malayalam')
+_INDIC_FIRST_BLOCK = 0x0900 >> 7
+_DEVANAGARI_BLOCK = 0x0900 >> 7
+_BENGALI_BLOCK = 0x0980 >> 7
+SCRIPT_DETECTION_SHARE = 0.8  # Share of non-ASCII letters one Indic block needs to skip the API
+# Scripts detect_language_fallback looks for, in priority order, with their block index
+_FALLBACK_SCRIPT_BLOCKS = (
+    ('Bengali', _BENGALI_BLOCK),   # U+0980..U+09FF
+    ('Hindi', _DEVANAGARI_BLOCK),  # U+0900..U+097F
+    ('Tamil', 0x0B80 >> 7),        # U+0B80..U+0BFF
+    ('Telugu', 0x0C00 >> 7),       # U+0C00..U+0C7F
+    ('Gujarati', 0x0A80 >> 7)      # U+0A80..U+0AFF
+)
+
+def codepoint_blocks(text):
+    """Counter of 128-codepoint block index (codepoint >> 7) -> count for the non-ASCII characters
+    
+    With NumPy the text is re-encoded once as UTF-32 and tallied with bincount in C."""
+    if text.isascii():
+        return Counter()
+    if NUMPY_AVAILABLE:
+        codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        counts = np.bincount(codepoints[codepoints > 127] >> 7)
+        blocks = np.flatnonzero(counts)
+        return Counter(dict(zip(blocks.tolist(), counts[blocks].tolist())))
+    return Counter(ord(char) >> 7 for char in text if not char.isascii())
+
+class ScriptCounts(NamedTuple):
+    unicode: int  # Characters above U+007F
+    bengali: int
+    hindi: int  # Devanagari block
+
+def script_counts(text):
+    """Non-ASCII, Bengali and Devanagari character counts from a single pass over text"""
+    blocks = codepoint_blocks(text)
+    return ScriptCounts(sum(blocks.values()), blocks[_BENGALI_BLOCK], blocks[_DEVANAGARI_BLOCK])
+
+def detect_language_by_script(text_sample):
+    """Detect the language from Unicode blocks alone; returns None when an API call is needed
+    
+    ASCII-only samples are English. Otherwise, if one Indic block holds more than
+    SCRIPT_DETECTION_SHARE of the non-ASCII letters and its script is written in a single
+    language, that language is returned."""
+    sample = text_sample[:2500]
+    if sample.isascii():
         return "English"
+    
+    blocks = codepoint_blocks(sample)
+    block_counts = Counter({
+        block - _INDIC_FIRST_BLOCK: count for block, count in blocks.items()
+        if 0 <= block - _INDIC_FIRST_BLOCK < len(_INDIC_BLOCK_LANGUAGES)
+    })
+    other_letters = 0
+    if sum(block_counts.values()) < sum(blocks.values()):
+        # Some non-Indic characters; only letters among them count against the share
+        other_letters = sum(
+            1 for char in sample
+            if not char.isascii()
+            and not 0 <= (ord(char) >> 7) - _INDIC_FIRST_BLOCK < len(_INDIC_BLOCK_LANGUAGES)
+            and char.isalpha()
+        )
+    
+    if not block_counts:
+        # Only non-ASCII punctuation/symbols (curly quotes, dashes) around English text
+        return "English" if not other_letters else None
+    block, count = block_counts.most_common(1)[0]
+    if count > SCRIPT_DETECTION_SHARE * (sum(block_counts.values()) + other_letters):
+        return _INDIC_BLOCK_LANGUAGES[block]
+    return None
+
+# Script names of the Indic blocks, laid out like _INDIC_BLOCK_LANGUAGES
+_INDIC_BLOCK_SCRIPTS = (
+    "Devanagari (Hindi)", "Bengali", "Gurmukhi (Punjabi)", "Gujarati", "Oriya",
+    "Tamil", "Telugu", "Kannada", "Malayalam"
+)
+
+def get_block_script(block):
+    """Script name for a 128-codepoint block index (codepoint >> 7), as codepoint_blocks() returns"""
+    index = block - _INDIC_FIRST_BLOCK
+    if 0 <= index < len(_INDIC_BLOCK_SCRIPTS):
+        return _INDIC_BLOCK_SCRIPTS[index]
+    return "Other Unicode"
 
 def get_script_range(char):
     """Get the script range for a Unicode character"""
-    code = ord(char)
-    if 0x0900 <= code <= 0x097F:
-        return "Devanagari (Hindi)"
-    elif 0x0980 <= code <= 0x09FF:
-        return "Bengali"
-    elif 0x0A00 <= code <= 0x0A7F:
-        return "Gurmukhi (Punjabi)"
-    elif 0x0A80 <= code <= 0x0AFF:
-        return "Gujarati"
-    elif 0x0B00 <= code <= 0x0B7F:
-        return "Oriya"
-    elif 0x0B80 <= code <= 0x0BFF:
-        return "Tamil"
-    elif 0x0C00 <= code <= 0x0C7F:
-        return "Telugu"
-    elif 0x0C80 <= code <= 0x0CFF:
-        return "Kannada"
-    elif 0x0D00 <= code <= 0x0D7F:
-        return "Malayalam"
-    else:
-        return "Other Unicode"
+    # Every Indic script is exactly one 128-codepoint block, so the block index is the lookup key
+    return get_block_script(ord(char) >> 7)
 
 # Mistral OCR Functions
 def check_mistral_ocr_availability():
@@ -186,7 +374,7 @@ def check_mistral_ocr_availability():
         }
         
         # Make a simple test request to check API availability
-        response = requests.get("https://api.mistral.ai/v1/models", headers=headers, timeout=10)
+        response = get_mistral_session().get("https://api.mistral.ai/v1/models", headers=headers, timeout=10)
         
         if response.status_code == 200:
             MISTRAL_OCR_AVAILABLE = True
@@ -233,7 +421,7 @@ def upload_file_to_mistral(file_data: bytes, filename: str, mistral_key: str) ->
             "purpose": "batch"  # Based on your n8n workflow
         }
         
-        response = requests.post(url, headers=headers, files=files, data=data, timeout=60)
+        response = get_mistral_session().post(url, headers=headers, files=files, data=data, timeout=60)
         
         if response.status_code == 200:
             result = response.json()
@@ -273,7 +461,7 @@ def get_mistral_ocr_result(file_id: str, mistral_key: str, language: str = "ben+
             "output_format": "text"
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=120)
+        response = get_mistral_session().post(url, headers=headers, json=payload, timeout=120)
         
         if response.status_code == 200:
             result = response.json()
@@ -507,6 +695,300 @@ VIOLATION_RULES = {
     }
 }
 
+# Frozen struct-of-arrays view of VIOLATION_RULES: parallel tuples indexed by rule number,
+# built once at import. Keywords are lowercased and interned for the scanners
+_RULE_IDS = tuple(VIOLATION_RULES)
+_RULE_INDEX = {rule_id: i for i, rule_id in enumerate(_RULE_IDS)}
+_RULE_DESCS = tuple(VIOLATION_RULES[r]['description'] for r in _RULE_IDS)
+_RULE_CONTEXTS = tuple(VIOLATION_RULES[r]['context'] for r in _RULE_IDS)
+_RULE_SEVERITIES = tuple(VIOLATION_RULES[r]['severity'] for r in _RULE_IDS)
+_RULE_KEYWORDS = tuple(
+    tuple(sys.intern(k.lower()) for k in VIOLATION_RULES[r]['keywords'])
+    for r in _RULE_IDS
+)
+
+# Prompt-ready rule lines, formatted once and ordered critical -> high -> medium so the
+# highest-risk rules come first in every analysis prompt
+_SEVERITY_ORDER = MappingProxyType({'critical': 0, 'high': 1, 'medium': 2, 'low': 3})
+_RULE_BLOCK = MappingProxyType({
+    rule_id: f"- {rule_id} ({severity}): {desc} | Context: {context} | Keywords: {', '.join(VIOLATION_RULES[rule_id]['keywords'])}"
+    for rule_id, severity, desc, context in zip(_RULE_IDS, _RULE_SEVERITIES, _RULE_DESCS, _RULE_CONTEXTS)
+})
+_RULE_IDS_SORTED = tuple(sorted(_RULE_IDS, key=lambda r: _SEVERITY_ORDER[_RULE_SEVERITIES[_RULE_INDEX[r]]]))
+_RULE_REFERENCE = "\n".join(_RULE_BLOCK[r] for r in _RULE_IDS_SORTED)
+
+def trie_regex_from_words(words):
+    """Build a regex alternation from a character trie so shared keyword prefixes are matched once"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True  # End-of-word marker
+    
+    def node_pattern(node):
+        alternatives = [re.escape(char) + node_pattern(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+    
+    return node_pattern(trie)
+
+# Keyword -> rule ids; several keywords ("idol", "tobacco", "credits", ...) belong to more than one rule
+_KW_TO_RULES = {}
+for _rule_id, _keywords in zip(_RULE_IDS, _RULE_KEYWORDS):
+    for _keyword in _keywords:
+        _rules = _KW_TO_RULES.setdefault(_keyword, [])
+        if _rule_id not in _rules:
+            _rules.append(_rule_id)
+_KW_TO_RULES = {keyword: tuple(rules) for keyword, rules in _KW_TO_RULES.items()}
+
+# One trie-shaped regex over every rule keyword. Lookarounds instead of \b so keywords
+# ending in punctuation ("disney+") still get a word boundary. The keywords are already
+# lowercase, so the pattern runs case-sensitively over text lowercased once per scan
+_KEYWORD_PATTERN = r"(?<!\w)(?:" + trie_regex_from_words(_KW_TO_RULES) + r")(?!\w)"
+_KEYWORD_RE = re.compile(_KEYWORD_PATTERN)
+_KEYWORD_RE_I = re.compile(_KEYWORD_PATTERN, re.IGNORECASE)  # For text whose lowercase shifts offsets
+
+# 26-bit presence masks over the ASCII letters a-z. A keyword can only occur in a text
+# whose mask covers the keyword's mask; mostly-Bengali chunks often rule out every keyword
+_LETTER_BITS = MappingProxyType({chr(ord('a') + i): 1 << i for i in range(26)})
+_LETTER_SET = frozenset(_LETTER_BITS)
+
+def letter_mask(text_lower):
+    """Bitmask of the ASCII letters present in already-lowercased text"""
+    mask = 0
+    for char in _LETTER_SET.intersection(text_lower):  # Set intersection runs in C
+        mask |= _LETTER_BITS[char]
+    return mask
+
+# Distinct keyword masks; keywords without ASCII letters get mask 0 and always pass
+_KEYWORD_MASKS = tuple(sorted({letter_mask(keyword) for keyword in _KW_TO_RULES}))
+
+def keywords_possible(text_lower):
+    """False when no keyword can occur in text_lower, so the scan can be skipped"""
+    mask = letter_mask(text_lower)
+    return any(mask & keyword_mask == keyword_mask for keyword_mask in _KEYWORD_MASKS)
+
+def scan_keywords(text: str) -> Dict[str, List[Tuple[int, str]]]:
+    """Scan text once for every rule keyword; returns rule id -> [(position, keyword), ...]"""
+    hits = {}
+    text_lower = text.lower()
+    if not keywords_possible(text_lower):
+        return hits
+    if len(text_lower) == len(text):
+        for match in _KEYWORD_RE.finditer(text_lower):
+            keyword = match.group()
+            for rule_id in _KW_TO_RULES[keyword]:
+                hits.setdefault(rule_id, []).append((match.start(), keyword))
+        return hits
+    
+    # Lowercasing changed the length (e.g. "İ"), so positions must come from the original text
+    for match in _KEYWORD_RE_I.finditer(text):
+        keyword = match.group().lower()
+        for rule_id in _KW_TO_RULES.get(keyword, ()):
+            hits.setdefault(rule_id, []).append((match.start(), keyword))
+    return hits
+
+# Same keyword table as a C Aho-Corasick automaton when pyahocorasick is installed.
+# SCRIPTZ_KEYWORD_SCAN=regex skips it and forces the regex scan everywhere, e.g. to
+# compare the two backends or exercise the fallback on a machine that has the extension
+KEYWORD_SCAN_BACKEND = os.environ.get('SCRIPTZ_KEYWORD_SCAN', 'auto').strip().lower()
+_AC = None
+if AHOCORASICK_AVAILABLE and KEYWORD_SCAN_BACKEND != 'regex':
+    _AC = ahocorasick.Automaton()
+    for _keyword, _rules in _KW_TO_RULES.items():
+        _AC.add_word(_keyword, (_keyword, _rules))
+    _AC.make_automaton()
+
+def scan_keywords_ac(text: str) -> Dict[str, List[Tuple[int, str]]]:
+    """Aho-Corasick version of scan_keywords - O(len(text) + hits) in C
+    
+    Unlike the regex scan, overlapping keywords ("acid" inside "acid attack") are all reported."""
+    text_lower = text.lower()
+    if _AC is None or len(text_lower) != len(text):
+        # No automaton, or lowercasing changed offsets (e.g. "İ") - use the regex scan
+        return scan_keywords(text)
+    
+    hits = {}
+    if not keywords_possible(text_lower):
+        return hits
+    text_len = len(text_lower)
+    for end, (keyword, rules) in _AC.iter(text_lower):
+        start = end - len(keyword) + 1
+        # Same word boundaries as _KEYWORD_RE
+        if start > 0 and (text_lower[start - 1].isalnum() or text_lower[start - 1] == '_'):
+            continue
+        if end + 1 < text_len and (text_lower[end + 1].isalnum() or text_lower[end + 1] == '_'):
+            continue
+        for rule_id in rules:
+            hits.setdefault(rule_id, []).append((start, keyword))
+    for rule_hits in hits.values():
+        rule_hits.sort()
+    return hits
+
+def keyword_hint(chunk):
+    """Prompt section listing the rules whose keywords appear in the chunk"""
+    hits = scan_keywords_ac(chunk)  # Falls back to the regex scan when there is no automaton
+    if not hits:
+        return ""
+    lines = [
+        f"- {rule_id.replace('_', ' ')}: " + ", ".join(sorted({keyword for _, keyword in rule_hits}))
+        for rule_id, rule_hits in hits.items()
+    ]
+    return "KEYWORD PRE-SCAN HITS (check these first, but do not limit the analysis to them):\n" + "\n".join(lines) + "\n\n"
+
+# Static guideline reference content, built once at import instead of on every rerun
+GUIDELINES = tuple(
+    (
+        f"{i + 1}. {_RULE_IDS[i].replace('_', ' ')}",
+        _RULE_SEVERITIES[i],
+        _RULE_DESCS[i],
+        _RULE_CONTEXTS[i],
+        ', '.join(_RULE_KEYWORDS[i])
+    )
+    for i in range(len(_RULE_IDS))
+)
+
+# All guideline rows pre-rendered as one HTML block, styled like the severity boxes, so
+# the reference expander sends a single element instead of two per rule
+_GUIDELINE_TPL = Template(
+    '<div style="background: $background; border-left: 4px solid $border; padding: 0.6rem 1rem; '
+    'border-radius: 4px; margin-bottom: 0.6rem;">$emoji <b>$title</b></div>'
+    '<p><b>Description:</b> $description</p>'
+    '<p><b>Context:</b> $context</p>'
+    '<p><b>Keywords:</b> $keywords</p><hr>'
+)
+GUIDELINES_HTML = "".join(
+    _GUIDELINE_TPL.substitute(
+        background=SEVERITY_BG.get(severity, SEVERITY_BG['medium']),
+        border=SEVERITY_BORDER.get(severity, SEVERITY_BORDER['medium']),
+        emoji=SEVERITY_ICON.get(severity, SEVERITY_ICON['medium']),
+        title=html.escape(title),
+        description=html.escape(description),
+        context=html.escape(context),
+        keywords=html.escape(keywords)
+    )
+    for title, severity, description, context, keywords in GUIDELINES
+)
+
+ANALYSIS_SCOPE_MD = """
+- **📝 Dialogues**: Every line of character speech
+- **🎬 Scene Descriptions**: Location setups, visual descriptions
+- **🎭 Action Lines**: Character movements, behaviors, actions
+- **👥 Character Names**: All character references and mentions
+- **🎪 Props & Settings**: Objects, locations, visual elements
+- **🎞️ Transitions**: Scene changes, cuts, fades, directions
+"""
+
+DETECTION_PHILOSOPHY_MD = """
+**✅ Better to Over-Detect than Miss Violations**
+- We flag anything that could potentially be problematic
+- When in doubt, we flag it for your review
+- Comprehensive analysis of all screenplay elements
+
+**🔍 Multi-Method Detection**
+- Keyword scanning for quick identification
+- Context analysis for subtle violations
+- Cultural sensitivity checks
+- Intent and meaning analysis
+
+**📋 Complete Coverage**
+- No element of your screenplay is ignored
+- Every dialogue line is examined
+- Every scene description is analyzed
+- Every action and prop is checked
+"""
+
+# Static text is emitted with one st.markdown call per block instead of one per line
+GUIDELINES_INTRO_MD = f"""### 🎯 hoichoi Standards & Practices Guidelines
+
+**Our system uses AGGRESSIVE DETECTION to find violations across your entire screenplay. We analyze every element thoroughly.**
+
+---
+
+### 🔍 **What We Analyze:**
+{ANALYSIS_SCOPE_MD}
+### ⚠️ **24 Violation Categories We Detect:**
+"""
+
+GUIDELINES_OUTRO_MD = f"""### 🎯 **Detection Philosophy**
+{DETECTION_PHILOSOPHY_MD}
+**📝 Result:** Comprehensive violation detection across your entire screenplay with detailed solutions for each issue found.
+"""
+
+UPLOAD_TAB_INTRO_MD = """**Upload your screenplay/script for comprehensive aggressive S&P compliance review.**
+
+*🔍 Aggressive Detection: We analyze EVERYTHING - dialogues, scene descriptions, action lines, character names, props, settings, transitions*
+
+*⚠️ Better to over-detect than miss violations - we flag anything potentially problematic*
+
+*📋 Complete Coverage: All 24 S&P guidelines checked across entire script*
+
+*🌐 Enhanced Unicode Support: Proper Bengali/Hindi text handling*
+
+*📊 XLSX Export: Full Unicode support in Excel reports*
+"""
+
+PASTE_TAB_INTRO_MD = """**Paste your screenplay content for comprehensive aggressive S&P compliance review.**
+
+*🔍 Aggressive Detection: We examine every line for potential violations*
+
+*⚠️ Thorough Analysis: Dialogues, scene descriptions, actions, character behavior, props, settings*
+
+*🌐 Enhanced Unicode Support: Perfect Bengali/Hindi text handling*
+"""
+
+FOOTER_HTML = """
+<div style='text-align: center; color: #666; font-size: 0.9em;'>
+    <p>🎬 hoichoi S&P Compliance System v3.0 - FIXED VERSION | Enhanced Unicode Support | Mistral OCR Integration | XLSX Export | Reviewed by: {user_name}</p>
+    <p>🔒 Secure access • 🔍 Aggressive violation detection • 🌐 Bengali/Hindi/Multi-language support • 📊 Full Unicode Excel reports • 🔍 Cloud OCR</p>
+    <p style="color: green;">✅ FIXES: PDF generation • Bengali text preservation • API error handling • Excel Unicode support</p>
+</div>
+"""
+
+USER_INFO_HTML = """
+<div class="user-info">
+    <h3>👤 User Information</h3>
+    <p><b>Name:</b> {user_name}</p>
+    <p><b>Email:</b> {user_email}</p>
+    <p><b>Role:</b> {role}</p>
+</div>
+"""
+
+# Login page styling and banner, sent together in one markdown call
+LOGIN_PAGE_HTML = """
+<style>
+.login-header {
+    background: linear-gradient(90deg, #ff6b6b, #4ecdc4);
+    padding: 2rem;
+    border-radius: 15px;
+    color: white;
+    text-align: center;
+    margin-bottom: 2rem;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+}
+.login-container {
+    background: white;
+    padding: 2rem;
+    border-radius: 15px;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    border: 1px solid #e0e0e0;
+}
+</style>
+<div class="login-header">
+    <h1>🎬 hoichoi S&P Compliance System - FIXED</h1>
+    <h3>Standards & Practices Content Review Platform</h3>
+    <p>✅ Bengali Text Preservation | 🔧 PDF Generation Fixed | 🔑 Enhanced API Error Handling</p>
+</div>
+"""
+
+AUTHORIZED_EMAIL_DOMAIN = '@hoichoi.tv'
+ADMIN_EMAILS = frozenset({'admin@hoichoi.tv', 'sp@hoichoi.tv', 'content@hoichoi.tv'})
+
 # Streamlit App Configuration
 st.set_page_config(
     page_title="hoichoi S&P Compliance Analyzer - FIXED",
@@ -517,7 +999,7 @@ st.set_page_config(
 # Authentication Functions
 def check_email_domain(email: str) -> bool:
     """Check if email belongs to hoichoi.tv domain"""
-    return email.lower().strip().endswith('@hoichoi.tv')
+    return email.strip().lower().endswith(AUTHORIZED_EMAIL_DOMAIN)
 
 def authenticate_user():
     """Handle user authentication for hoichoi.tv employees only"""
@@ -525,35 +1007,8 @@ def authenticate_user():
         st.session_state.authenticated = False
     
     if not st.session_state.authenticated:
-        # Custom CSS for login page
-        st.markdown("""
-        <style>
-        .login-header {
-            background: linear-gradient(90deg, #ff6b6b, #4ecdc4);
-            padding: 2rem;
-            border-radius: 15px;
-            color: white;
-            text-align: center;
-            margin-bottom: 2rem;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }
-        .login-container {
-            background: white;
-            padding: 2rem;
-            border-radius: 15px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            border: 1px solid #e0e0e0;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="login-header">
-            <h1>🎬 hoichoi S&P Compliance System - FIXED</h1>
-            <h3>Standards & Practices Content Review Platform</h3>
-            <p>✅ Bengali Text Preservation | 🔧 PDF Generation Fixed | 🔑 Enhanced API Error Handling</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Custom CSS and banner for login page
+        st.markdown(LOGIN_PAGE_HTML, unsafe_allow_html=True)
         
         with st.container():
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -585,7 +1040,7 @@ def authenticate_user():
                                     st.session_state.authenticated = True
                                     st.session_state.user_email = email
                                     st.session_state.user_name = email.split('@')[0].replace('.', ' ').title()
-                                    st.session_state.is_admin = email.lower() in ['admin@hoichoi.tv', 'sp@hoichoi.tv', 'content@hoichoi.tv']
+                                    st.session_state.is_admin = email.lower() in ADMIN_EMAILS
                                     st.success("✅ Login successful! Redirecting...")
                                     time.sleep(1)
                                     st.rerun()
@@ -629,6 +1084,32 @@ def get_api_key():
     except:
         return None
 
+# One OpenAI client per API key for the whole process, so every call reuses its
+# connection pool and TLS sessions instead of opening new ones. st.cache_resource
+# keeps the clients across reruns, which re-execute this script from the top
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _shared_openai_client(api_key):
+    return OpenAI(api_key=api_key)
+
+def get_openai_client(api_key=None):
+    """Return the shared OpenAI client for api_key (defaults to the configured key), or None"""
+    api_key = api_key or get_api_key()
+    if not OPENAI_AVAILABLE or not api_key:
+        return None
+    return _shared_openai_client(api_key)
+
+# Mistral is called through plain HTTP, so share one requests.Session the same way:
+# keep-alive connections are reused across chunks, solutions and reruns
+@st.cache_resource(show_spinner=False)
+def get_mistral_session():
+    """Return the process-wide HTTP session for Mistral API calls"""
+    session = requests.Session()
+    # Enough pooled connections for every chunk and solution worker in flight
+    session.mount('https://', requests.adapters.HTTPAdapter(
+        pool_maxsize=MAX_CONCURRENT_CHUNKS + MAX_CONCURRENT_SOLUTIONS
+    ))
+    return session
+
 def get_mistral_api_key():
     """Get Mistral API key from Streamlit secrets or user input"""
     try:
@@ -680,7 +1161,7 @@ def detect_language_with_mistral(text_sample, api_key):
             "temperature": 0
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_mistral_session().post(url, json=payload, headers=headers, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -690,7 +1171,7 @@ def detect_language_with_mistral(text_sample, api_key):
             valid_languages = ['English', 'Bengali', 'Hindi', 'Tamil', 'Telugu', 'Gujarati', 'Marathi', 'Punjabi', 'Urdu', 'Malayalam', 'Kannada', 'Odia', 'Assamese']
             
             # Special check for Bengali characters
-            bengali_chars = sum(1 for char in sample if '\u0980' <= char <= '\u09FF')
+            bengali_chars = script_counts(sample).bengali
             if bengali_chars > 0:
                 return "Bengali"
             
@@ -718,6 +1199,11 @@ def setup_unicode_fonts():
 
 def detect_language(text_sample):
     """Detect the primary language of the text using Mistral (preferred) or OpenAI - ENHANCED"""
+    # Scripts that identify their language on their own need no API call
+    detected = detect_language_by_script(text_sample)
+    if detected:
+        return detected
+    
     # Try Mistral first
     mistral_api_key = get_mistral_api_key_with_session()
     if MISTRAL_AVAILABLE and mistral_api_key:
@@ -729,7 +1215,7 @@ def detect_language(text_sample):
     openai_api_key = get_api_key()
     if OPENAI_AVAILABLE and openai_api_key:
         try:
-            client = OpenAI(api_key=openai_api_key)
+            client = get_openai_client(openai_api_key)
             
             # Take a larger sample for better detection
             sample = text_sample[:2500] if len(text_sample) > 2500 else text_sample
@@ -750,7 +1236,7 @@ def detect_language(text_sample):
             valid_languages = ['English', 'Bengali', 'Hindi', 'Tamil', 'Telugu', 'Gujarati', 'Marathi', 'Punjabi', 'Urdu', 'Malayalam', 'Kannada', 'Odia', 'Assamese']
             
             # Special check for Bengali characters
-            bengali_chars = sum(1 for char in sample if '\u0980' <= char <= '\u09FF')
+            bengali_chars = script_counts(sample).bengali
             if bengali_chars > 0:
                 return "Bengali"
             
@@ -763,52 +1249,82 @@ def detect_language(text_sample):
     # Enhanced fallback to character-based detection
     return detect_language_fallback(text_sample)
 
-def extract_text_from_pdf_bytes(file_bytes):
-    """Extract text from uploaded PDF file bytes with page preservation - ENHANCED Unicode support"""
-    if not PDF_EXTRACT_AVAILABLE:
-        st.error("❌ PDF extraction libraries not available. Please install PyPDF2 and pdfplumber.")
+# Each backend yields (page_text, page_count) so callers can report progress
+def _fitz_page_texts(file_bytes):
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        for page in doc:
+            yield page.get_text("text") or "", doc.page_count
+
+def _pdfplumber_page_texts(file_bytes):
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or "", len(pdf.pages)
+            page.flush_cache()  # Drop pdfminer layout objects as we go
+
+def _pypdf2_page_texts(file_bytes):
+    pages = PyPDF2.PdfReader(io.BytesIO(file_bytes)).pages
+    for page in pages:
+        yield page.extract_text() or "", len(pages)
+
+# PyMuPDF is the fast default. SCRIPTZ_PDF_BACKEND=pdfplumber tries pdfplumber first
+# instead, whose layout-aware text keeps table-heavy PDFs in reading order
+PDF_TEXT_BACKEND = os.environ.get('SCRIPTZ_PDF_BACKEND', 'auto').strip().lower()
+
+def iter_pdf_pages(file_bytes, on_page=None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_num, page_text) for each non-empty PDF page, one page at a time
+    
+    Backends are tried in order PyMuPDF -> pdfplumber -> PyPDF2 (pdfplumber first when
+    PDF_TEXT_BACKEND is 'pdfplumber'); if one fails partway
+    the next one resumes after the last page already yielded. on_page(page_num, page_count)
+    is called for every page, empty ones included, for progress reporting."""
+    backends = []
+    if FITZ_AVAILABLE:
+        backends.append(("PyMuPDF", _fitz_page_texts))
+    if PDF_EXTRACT_AVAILABLE:
+        backends.append(("PDFPlumber", _pdfplumber_page_texts))
+        backends.append(("PyPDF2", _pypdf2_page_texts))
+        if PDF_TEXT_BACKEND == 'pdfplumber':
+            backends.sort(key=lambda backend: backend[0] != "PDFPlumber")
+    
+    pages_done = 0
+    for i, (name, page_texts) in enumerate(backends):
+        try:
+            for page_num, (page_text, page_count) in enumerate(page_texts(file_bytes), 1):
+                if page_num <= pages_done:
+                    continue
+                pages_done = page_num
+                if on_page:
+                    on_page(page_num, page_count)
+                # ENHANCED: Better Unicode handling
+                if page_text.strip():
+                    yield page_num, safe_unicode_text(page_text)
+            return
+        except Exception as e:
+            if i == len(backends) - 1:
+                raise
+            st.warning(f"{name} failed: {e}, trying {backends[i + 1][0]}...")
+
+def extract_text_from_pdf_bytes(file_bytes, on_page=None):
+    """Extract text from uploaded PDF file bytes with page preservation - ENHANCED Unicode support
+    
+    on_page(page_num, page_count) is called as each page is read."""
+    if not FITZ_AVAILABLE and not PDF_EXTRACT_AVAILABLE:
+        st.error("❌ PDF extraction libraries not available. Please install PyMuPDF, or PyPDF2 and pdfplumber.")
         return None, []
     
     try:
         pages_data = []
-        full_text = ""
+        text_parts = []
         
-        # Try using pdfplumber first (better for complex layouts and Unicode)
-        try:
-            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text() or ""
-                    
-                    # ENHANCED: Better Unicode handling
-                    if page_text.strip():
-                        # Properly handle Unicode text
-                        page_text = safe_unicode_text(page_text)
-                        
-                        pages_data.append({
-                            'page_number': page_num,
-                            'text': page_text.strip(),
-                            'original_page': page_num  # Preserve original page number
-                        })
-                        full_text += f"\n=== ORIGINAL PAGE {page_num} ===\n{page_text}\n"
-        except Exception as e:
-            st.warning(f"PDFPlumber failed: {e}, trying PyPDF2...")
-            # Fallback to PyPDF2
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text() or ""
-                
-                if page_text.strip():
-                    # ENHANCED: Better Unicode handling
-                    page_text = safe_unicode_text(page_text)
-                    
-                    pages_data.append({
-                        'page_number': page_num,
-                        'text': page_text.strip(),
-                        'original_page': page_num  # Preserve original page number
-                    })
-                    full_text += f"\n=== ORIGINAL PAGE {page_num} ===\n{page_text}\n"
+        for page_num, page_text in iter_pdf_pages(file_bytes, on_page):
+            pages_data.append({
+                'page_number': page_num,
+                'text': page_text.strip(),
+                'original_page': page_num  # Preserve original page number
+            })
+            text_parts.append(f"\n=== ORIGINAL PAGE {page_num} ===\n{page_text}\n")
         
-        return full_text, pages_data
+        return "".join(text_parts), pages_data
         
     except Exception as e:
         st.error(f"Error extracting text from PDF: {e}")
@@ -823,28 +1339,27 @@ def extract_text_from_docx_bytes(file_bytes):
     try:
         doc = Document(io.BytesIO(file_bytes))
         pages_data = []
-        full_text = ""
+        text_parts = []  # Page sections, joined once at the end
         
         # Enhanced screenplay parsing with better Unicode support
         current_page = 1
-        current_page_text = ""
-        char_count = 0
+        page_parts = []  # Stripped paragraphs of the current page, joined on flush
+        page_len = 0  # Running length of the page text, so it is never re-measured
         
-        screenplay_elements = []
+        page_elements = []  # Screenplay elements of the current page, handed to pages_data on flush
         
         for para in doc.paragraphs:
-            para_text = para.text.strip()
+            # ENHANCED: Better Unicode handling; stripped after normalization so every
+            # buffered paragraph is already trimmed and pages never need a strip() pass
+            para_text = safe_unicode_text(para.text).strip()
             
             if not para_text:
                 continue
             
-            # ENHANCED: Better Unicode handling
-            para_text = safe_unicode_text(para_text)
-            
             # Detect screenplay elements
             element_type = detect_screenplay_element(para_text, para)
             
-            screenplay_elements.append({
+            page_elements.append({
                 'text': para_text,
                 'type': element_type,
                 'page': current_page
@@ -853,65 +1368,131 @@ def extract_text_from_docx_bytes(file_bytes):
             # Check for manual page breaks
             if has_page_break(para):
                 # Save current page
-                if current_page_text.strip():
+                if page_parts:
+                    current_page_text = "\n".join(page_parts)
                     pages_data.append({
                         'page_number': current_page,
-                        'text': current_page_text.strip(),
+                        'text': current_page_text,
                         'original_page': current_page,
-                        'screenplay_elements': [e for e in screenplay_elements if e['page'] == current_page]
+                        'screenplay_elements': page_elements
                     })
-                    full_text += f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n"
+                    text_parts.append(f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n\n")
                 
                 current_page += 1
-                current_page_text = ""
-                char_count = 0
+                page_parts = []
+                page_elements = []
+                page_len = 0
             else:
-                current_page_text += para_text + "\n"
-                char_count += len(para_text) + 1
+                page_parts.append(para_text)
+                page_len += len(para_text) + 1
                 
                 # Automatic page break based on character count (approximate)
-                if char_count > 2000:  # Rough estimate for one page
+                if page_len > 2000:  # Rough estimate for one page
+                    current_page_text = "\n".join(page_parts)
                     pages_data.append({
                         'page_number': current_page,
-                        'text': current_page_text.strip(),
+                        'text': current_page_text,
                         'original_page': current_page,
-                        'screenplay_elements': [e for e in screenplay_elements if e['page'] == current_page]
+                        'screenplay_elements': page_elements
                     })
-                    full_text += f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n"
+                    text_parts.append(f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n\n")
                     
                     current_page += 1
-                    current_page_text = ""
-                    char_count = 0
+                    page_parts = []
+                    page_elements = []
+                    page_len = 0
         
         # Add remaining text
-        if current_page_text.strip():
+        if page_parts:
+            current_page_text = "\n".join(page_parts)
             pages_data.append({
                 'page_number': current_page,
-                'text': current_page_text.strip(),
+                'text': current_page_text,
                 'original_page': current_page,
-                'screenplay_elements': [e for e in screenplay_elements if e['page'] == current_page]
+                'screenplay_elements': page_elements
             })
-            full_text += f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n"
+            text_parts.append(f"\n=== ORIGINAL PAGE {current_page} ===\n{current_page_text}\n\n")
         
-        return full_text, pages_data
+        return "".join(text_parts), pages_data
         
     except Exception as e:
         st.error(f"Error extracting text: {e}")
         return None, []
 
+def _content_digest(data):
+    """128-bit content hash used for every cache key and dedupe key in the app"""
+    # blake2b on purpose: CPython's implementation is 2-3x faster than sha256 on
+    # multi-MB uploads, and 16 bytes is plenty for a cache key. This is not a
+    # security boundary, so please don't "upgrade" it to sha256.
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class ExtractionFailed(Exception):
+    """Raised by the cached extractors instead of returning (None, []), so st.cache_data
+    doesn't keep a failure (a timeout, a parser exception) and a retry extracts again"""
+
+# The cached wrappers are keyed by a blake2b digest of the content; the leading
+# underscore keeps Streamlit from hashing the (possibly multi-MB) payload itself
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _cached_extract_pdf(file_hash, _file_bytes, _on_page=None):
+    """Cached PDF extraction - reruns with the same upload skip the re-parse"""
+    result = extract_text_from_pdf_bytes(_file_bytes, _on_page)
+    # The pdfplumber/pdfminer path leaves layout objects full of reference cycles;
+    # reclaim them now rather than whenever the cyclic collector next runs
+    gc.collect()
+    if result[0] is None:
+        raise ExtractionFailed
+    return result
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _cached_extract_docx(file_hash, _file_bytes):
+    """Cached DOCX extraction - reruns with the same upload skip the re-parse"""
+    result = extract_text_from_docx_bytes(_file_bytes)
+    if result[0] is None:
+        raise ExtractionFailed
+    return result
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_detect_language(text_hash, _text):
+    """Cached language detection - skips the paid API call for text already seen"""
+    return detect_language(_text)
+
+def cached_detect_language(text):
+    return _cached_detect_language(_content_digest(text), text)
+
+# Upload extension -> cached extractor
+EXTRACTORS = {
+    'pdf': _cached_extract_pdf,
+    'docx': _cached_extract_docx
+}
+
+# Screenplay element patterns, compiled once. Scene headings: INT./EXT./INTERIOR/EXTERIOR,
+# or INT/EXT followed by whitespace (e.g. "INT LIVING ROOM")
+_SCENE_HEADING_RE = re.compile(r'INT\.|EXT\.|INTERIOR|EXTERIOR|(?:INT|EXT)\.?\s')
+_TRANSITION_SUFFIXES = ('TO:', 'OUT:', 'IN:')  # Covers FADE IN:, FADE OUT:, CUT TO:, DISSOLVE TO:
+
+def _is_likely_character(text):
+    """Character cue test: all caps and at most three words
+    
+    Same result as text.isupper() and len(text.split()) <= 3, but a lowercase first
+    letter rejects without a scan and the word count stops splitting after the fourth word."""
+    if text[:1].islower() or not text.isupper():
+        return False
+    return len(text.split(None, 3)) <= 3
+
 def detect_screenplay_element(text, para):
     """Detect screenplay element type (scene heading, character, dialogue, action, etc.)"""
-    text_upper = text.upper()
+    # Both uppercase tests only look at the ends of the text, so uppercase just those
+    # slices: a heading match spans at most 9 characters, a transition suffix 4.
+    # Headings start with I or E, and only "IiEeı" uppercase to those
     
     # Scene headings
-    if (text_upper.startswith(('INT.', 'EXT.', 'INTERIOR', 'EXTERIOR')) or
-        re.match(r'^(INT|EXT)\.?\s+', text_upper)):
+    if text[:1] in 'IiEe\u0131' and _SCENE_HEADING_RE.match(text[:9].upper()):
         return 'SCENE_HEADING'
     
     # Character names (usually centered or in caps)
-    if (text.isupper() and len(text.split()) <= 3 and 
-        not text.startswith(('INT.', 'EXT.')) and
-        len(text) < 50):
+    if len(text) < 50 and _is_likely_character(text):
         return 'CHARACTER'
     
     # Parentheticals
@@ -919,8 +1500,7 @@ def detect_screenplay_element(text, para):
         return 'PARENTHETICAL'
     
     # Transitions
-    if (text_upper.endswith(('TO:', 'OUT:', 'IN:')) or
-        text_upper in ['FADE IN:', 'FADE OUT:', 'CUT TO:', 'DISSOLVE TO:']):
+    if text[-4:].upper().endswith(_TRANSITION_SUFFIXES):
         return 'TRANSITION'
     
     # Action/Description (default for longer text)
@@ -930,56 +1510,52 @@ def detect_screenplay_element(text, para):
     # Dialogue (shorter text that's not other elements)
     return 'DIALOGUE'
 
+# WordprocessingML tag/attribute names for <w:br w:type="page"/>
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BR = _W_NS + 'br'
+_W_TYPE = _W_NS + 'type'
+
 def has_page_break(para):
     """Check if paragraph has a page break"""
     try:
-        # Check for page break in Word document
+        # Check for page break in Word document - a plain tag walk, no XPath compilation
         if hasattr(para, '_element'):
-            for br in para._element.xpath('.//w:br[@w:type="page"]'):
-                return True
+            for br in para._element.iter(_W_BR):
+                if br.get(_W_TYPE) == 'page':
+                    return True
         return False
     except:
         return False
 
-def generate_ai_solution(violation_text, violation_type, explanation, detected_language, api_key):
-    """Generate AI solution for the violation using Mistral (preferred) or OpenAI - ENHANCED"""
+# Map violation type to specific guidance
+SOLUTION_GUIDANCE = MappingProxyType({
+    "National_Anthem_Misuse": "Remove commercial use of national anthem; use instrumental version or replace with original music",
+    "Personal_Information_Exposure": "Blur/mask personal information; use fictional phone numbers and addresses",
+    "OTT_Platform_Promotion": "Remove references to competing platforms; replace with generic terms or hoichoi references",
+    "National_Emblem_Misuse": "Remove improper flag usage; ensure respectful display according to Flag Code of India",
+    "National_Symbol_Distortion": "Restore accurate representation of national symbols and Indian map",
+    "Religious_Footwear_Context": "Remove footwear in religious settings; ensure actors are barefoot near idols/temples",
+    "Buddha_Idol_Misuse": "Remove Buddha images from clothing/inappropriate contexts; use respectfully or remove",
+    "Religious_Mockery": "Rewrite dialogue to be respectful of religious beliefs and symbols",
+    "Caste_Religion_References": "Replace with neutral language; avoid caste/community-specific terms",
+    "Social_Evils_Promotion": "Reframe to show negative consequences; don't glorify harmful practices",
+    "Self_Harm_Graphic_Content": "Make suggestive rather than explicit; focus on emotional impact, not graphic details",
+    "Acid_Attack_Depiction": "Remove or significantly tone down; use off-screen treatment",
+    "Child_Adult_Behavior": "Rewrite dialogue age-appropriately; ensure child actors behave naturally",
+    "Child_Abuse_Content": "Remove completely; find alternative plot devices",
+    "Unauthorized_Branding": "Blur visible brand names and logos; use generic alternatives",
+    "Alcohol_Cigarette_Brands": "Blur alcohol/tobacco brands; use generic packaging",
+    "Smoking_Disclaimer_Missing": "Add 'Smoking Kills' disclaimer during smoking scenes",
+    "Animal_Harm_Depiction": "Remove animal harm scenes; use CGI or off-screen treatment"
+})
+
+SOLUTION_SYSTEM_PROMPT = "You are an expert content editor specializing in S&P compliance for hoichoi digital platform. You are multilingual and can provide solutions in Bengali, Hindi, and other Indian languages. Always match the language of the original content."
+
+def create_solution_prompt(violation_text, violation_type, explanation, detected_language, source_note=""):
+    """Build the revision prompt for a single violation"""
+    specific_guidance = SOLUTION_GUIDANCE.get(violation_type, "Revise content to comply with broadcasting standards")
     
-    # Try Mistral first
-    mistral_key = get_mistral_api_key_with_session()
-    if MISTRAL_AVAILABLE and mistral_key:
-        try:
-            url = "https://api.mistral.ai/v1/chat/completions"
-            
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {mistral_key}"
-            }
-            
-            # Map violation type to specific guidance
-            guideline_context = {
-                "National_Anthem_Misuse": "Remove commercial use of national anthem; use instrumental version or replace with original music",
-                "Personal_Information_Exposure": "Blur/mask personal information; use fictional phone numbers and addresses",
-                "OTT_Platform_Promotion": "Remove references to competing platforms; replace with generic terms or hoichoi references",
-                "National_Emblem_Misuse": "Remove improper flag usage; ensure respectful display according to Flag Code of India",
-                "National_Symbol_Distortion": "Restore accurate representation of national symbols and Indian map",
-                "Religious_Footwear_Context": "Remove footwear in religious settings; ensure actors are barefoot near idols/temples",
-                "Buddha_Idol_Misuse": "Remove Buddha images from clothing/inappropriate contexts; use respectfully or remove",
-                "Religious_Mockery": "Rewrite dialogue to be respectful of religious beliefs and symbols",
-                "Caste_Religion_References": "Replace with neutral language; avoid caste/community-specific terms",
-                "Social_Evils_Promotion": "Reframe to show negative consequences; don't glorify harmful practices",
-                "Self_Harm_Graphic_Content": "Make suggestive rather than explicit; focus on emotional impact, not graphic details",
-                "Acid_Attack_Depiction": "Remove or significantly tone down; use off-screen treatment",
-                "Child_Adult_Behavior": "Rewrite dialogue age-appropriately; ensure child actors behave naturally",
-                "Child_Abuse_Content": "Remove completely; find alternative plot devices",
-                "Unauthorized_Branding": "Blur visible brand names and logos; use generic alternatives",
-                "Alcohol_Cigarette_Brands": "Blur alcohol/tobacco brands; use generic packaging",
-                "Smoking_Disclaimer_Missing": "Add 'Smoking Kills' disclaimer during smoking scenes",
-                "Animal_Harm_Depiction": "Remove animal harm scenes; use CGI or off-screen treatment"
-            }
-            
-            specific_guidance = guideline_context.get(violation_type, "Revise content to comply with broadcasting standards")
-            
-            prompt = f"""You are an expert content editor for hoichoi digital platform. Generate a compliant revision for this S&P violation.
+    return f"""You are an expert content editor for hoichoi digital platform. Generate a compliant revision for this S&P violation{source_note}.
 
 VIOLATION DETAILS:
 - Type: {violation_type}
@@ -998,79 +1574,195 @@ INSTRUCTIONS:
 7. Make the minimum necessary changes to achieve compliance
 
 Return ONLY the revised content solution in the same language as the original, nothing else."""
+
+# Process-wide LRU of successful solutions; Streamlit sessions run on separate threads.
+# Held by st.cache_resource because every rerun re-executes this script from the top
+@st.cache_resource(show_spinner=False)
+def get_solution_cache():
+    """The shared (OrderedDict, Lock) pair behind get_cached_solution/store_cached_solution"""
+    return OrderedDict(), threading.Lock()
+
+def solution_cache_key(violation_text, violation_type, detected_language):
+    """Case- and whitespace-insensitive key for a violation's solution"""
+    return (" ".join(violation_text.lower().split()), violation_type, detected_language)
+
+def get_cached_solution(key):
+    """Return a previously generated solution, or None"""
+    solution_cache, lock = get_solution_cache()
+    with lock:
+        solution = solution_cache.get(key)
+        if solution is not None:
+            solution_cache.move_to_end(key)
+        return solution
+
+def store_cached_solution(key, solution):
+    """Remember a successful solution, evicting the least recently used entry when full"""
+    solution_cache, lock = get_solution_cache()
+    with lock:
+        solution_cache[key] = solution
+        solution_cache.move_to_end(key)
+        while len(solution_cache) > SOLUTION_CACHE_SIZE:
+            solution_cache.popitem(last=False)
+
+def request_mistral_solution(prompt, mistral_key):
+    """Call Mistral for a solution; returns (solution, warning) and never touches the UI so it can run off-thread"""
+    try:
+        url = "https://api.mistral.ai/v1/chat/completions"
+        
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {mistral_key}"
+        }
+        
+        payload = {
+            "model": "mistral-small",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": SOLUTION_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 300,
+            "temperature": 0.3
+        }
+        
+        get_rate_limiter('mistral').acquire()
+        response = get_mistral_session().post(url, json=payload, headers=headers, timeout=60)
+        
+        if response.status_code == 200:
+            result = response.json()
+            solution = result['choices'][0]['message']['content'].strip()
+            # Ensure Unicode is properly handled
+            return safe_unicode_text(solution), None
+        elif response.status_code == 429:
+            return None, "⚠️ Mistral API rate limit reached, trying OpenAI..."
+        elif response.status_code == 402:
+            return None, "⚠️ Mistral API billing issue, trying OpenAI..."
+        return None, None
             
-            payload = {
-                "model": "mistral-small",
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "You are an expert content editor specializing in S&P compliance for hoichoi digital platform. You are multilingual and can provide solutions in Bengali, Hindi, and other Indian languages. Always match the language of the original content."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 300,
-                "temperature": 0.3
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            
-            if response.status_code == 200:
-                result = response.json()
-                solution = result['choices'][0]['message']['content'].strip()
-                # Ensure Unicode is properly handled
-                return safe_unicode_text(solution)
-            elif response.status_code == 429:
-                st.warning("⚠️ Mistral API rate limit reached, trying OpenAI...")
-            elif response.status_code == 402:
-                st.warning("⚠️ Mistral API billing issue, trying OpenAI...")
-                
-        except Exception as e:
-            st.warning(f"Mistral solution generation failed: {e}")
+    except Exception as e:
+        return None, f"Mistral solution generation failed: {e}"
+
+def solution_messages(violation_text, violation_type, explanation, detected_language):
+    """Chat messages for the OpenAI solution request"""
+    prompt = create_solution_prompt(
+        violation_text, violation_type, explanation, detected_language,
+        source_note=" detected through hybrid analysis (keywords + context)"
+    )
+    return [
+        {"role": "system", "content": SOLUTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def solution_error_message(e):
+    """User-facing text for a failed OpenAI solution request"""
+    error_msg = str(e)
+    if "billing_not_active" in error_msg:
+        return f"❌ OpenAI billing issue: {error_msg}. Please check your billing at https://platform.openai.com/account/billing"
+    elif "quota" in error_msg.lower():
+        return f"❌ OpenAI quota exceeded: {error_msg}"
+    else:
+        return f"Error generating solution: {error_msg}"
+
+# Solutions that report a failure instead of a fix, as built by solution_error_message
+# and the "not available" fallback
+SOLUTION_ERROR_PREFIXES = ("Error generating solution", "❌ OpenAI", "AI solution generation not available")
+
+def is_solution_error(solution):
+    """True if solution is a failure message rather than an AI solution"""
+    return solution.startswith(SOLUTION_ERROR_PREFIXES)
+
+def generate_ai_solution(violation_text, violation_type, explanation, detected_language, api_key):
+    """Generate AI solution for the violation using Mistral (preferred) or OpenAI - ENHANCED"""
+    
+    cache_key = solution_cache_key(violation_text, violation_type, detected_language)
+    solution = get_cached_solution(cache_key)
+    if solution is not None:
+        return solution
+    
+    # Try Mistral first
+    mistral_key = get_mistral_api_key_with_session()
+    if MISTRAL_AVAILABLE and mistral_key:
+        prompt = create_solution_prompt(violation_text, violation_type, explanation, detected_language)
+        solution, warning = request_mistral_solution(prompt, mistral_key)
+        if solution is not None:
+            store_cached_solution(cache_key, solution)
+            return solution
+        if warning:
+            st.warning(warning)
     
     # Fallback to OpenAI with enhanced multilingual support
     if not OPENAI_AVAILABLE or not api_key:
         return "AI solution generation not available"
     
     try:
-        client = OpenAI(api_key=api_key)
-        
-        # Map violation type to specific guidance
-        guideline_context = {
-            "National_Anthem_Misuse": "Remove commercial use of national anthem; use instrumental version or replace with original music",
-            "Personal_Information_Exposure": "Blur/mask personal information; use fictional phone numbers and addresses",
-            "OTT_Platform_Promotion": "Remove references to competing platforms; replace with generic terms or hoichoi references",
-            "National_Emblem_Misuse": "Remove improper flag usage; ensure respectful display according to Flag Code of India",
-            "National_Symbol_Distortion": "Restore accurate representation of national symbols and Indian map",
-            "Religious_Footwear_Context": "Remove footwear in religious settings; ensure actors are barefoot near idols/temples",
-            "Buddha_Idol_Misuse": "Remove Buddha images from clothing/inappropriate contexts; use respectfully or remove",
-            "Religious_Mockery": "Rewrite dialogue to be respectful of religious beliefs and symbols",
-            "Caste_Religion_References": "Replace with neutral language; avoid caste/community-specific terms",
-            "Social_Evils_Promotion": "Reframe to show negative consequences; don't glorify harmful practices",
-            "Self_Harm_Graphic_Content": "Make suggestive rather than explicit; focus on emotional impact, not graphic details",
-            "Acid_Attack_Depiction": "Remove or significantly tone down; use off-screen treatment",
-            "Child_Adult_Behavior": "Rewrite dialogue age-appropriately; ensure child actors behave naturally",
-            "Child_Abuse_Content": "Remove completely; find alternative plot devices",
-            "Unauthorized_Branding": "Blur visible brand names and logos; use generic alternatives",
-            "Alcohol_Cigarette_Brands": "Blur alcohol/tobacco brands; use generic packaging",
-            "Smoking_Disclaimer_Missing": "Add 'Smoking Kills' disclaimer during smoking scenes",
-            "Animal_Harm_Depiction": "Remove animal harm scenes; use CGI or off-screen treatment"
-        }
+        client = get_openai_client(api_key)
+        
+        get_rate_limiter('openai').acquire()
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=solution_messages(violation_text, violation_type, explanation, detected_language),
+            max_tokens=300,
+            temperature=0.3
+        )
         
-        specific_guidance = guideline_context.get(violation_type, "Revise content to comply with broadcasting standards")
+        solution = response.choices[0].message.content.strip()
+        # Ensure Unicode is properly handled
+        solution = safe_unicode_text(solution)
+        store_cached_solution(cache_key, solution)
+        return solution
         
-        prompt = f"""You are an expert content editor for hoichoi digital platform. Generate a compliant revision for this S&P violation detected through hybrid analysis (keywords + context).
+    except Exception as e:
+        return solution_error_message(e)
 
-VIOLATION DETAILS:
-- Type: {violation_type}
-- Problematic Content: "{violation_text}"
-- Issue: {explanation}
-- Content Language: {detected_language}
-- Specific Guidance: {specific_guidance}
+SOLUTION_GROUP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "solutions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "solutions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer"},
+                            "solution": {"type": "string"}
+                        },
+                        "required": ["index", "solution"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["solutions"],
+            "additionalProperties": False
+        }
+    }
+}
 
-INSTRUCTIONS:
+def solution_group_messages(violations, detected_language):
+    """Chat messages asking OpenAI to revise several violations in one request"""
+    sections = "\n\n".join(
+        f"""=== VIOLATION {k} ===
+- Type: {v.get('violationType', '')}
+- Problematic Content: "{v.get('violationText', '')}"
+- Issue: {v.get('explanation', '')}
+- Specific Guidance: {SOLUTION_GUIDANCE.get(v.get('violationType', ''), "Revise content to comply with broadcasting standards")}"""
+        for k, v in enumerate(violations, 1)
+    )
+    prompt = f"""You are an expert content editor for hoichoi digital platform. Generate a compliant revision for each of these {len(violations)} S&P violations detected through hybrid analysis (keywords + context).
+
+Content Language: {detected_language}
+
+{sections}
+
+INSTRUCTIONS (apply to every violation):
 1. Provide a revised version that eliminates the S&P violation completely
 2. Maintain the original creative intent where possible
 3. Keep the same language as the original content ({detected_language})
@@ -1079,58 +1771,211 @@ INSTRUCTIONS:
 6. Ensure the solution is appropriate for Indian digital content standards
 7. Make the minimum necessary changes to achieve compliance
 
-Return ONLY the revised content solution in the same language as the original, nothing else."""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert content editor specializing in S&P compliance for hoichoi digital platform. You are multilingual and can provide solutions in Bengali, Hindi, and other Indian languages. Always match the language of the original content."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.3
+Return JSON with one entry per violation: {{"solutions": [{{"index": 1, "solution": "..."}}, ...]}}
+Each solution is ONLY the revised content in the same language as the original, nothing else."""
+    return [
+        {"role": "system", "content": SOLUTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+async def generate_ai_solutions_batch(violations, detected_language, api_key, on_done=None):
+    """Generate AI solutions for all violations concurrently - returns (solutions, warnings)
+    
+    Violations sharing a solution_cache_key are requested once, and cached solutions are
+    reused without a request. Mistral (when configured) gets one request per violation in
+    worker threads; what it leaves unsolved goes to OpenAI SOLUTIONS_PER_REQUEST at a time
+    on one AsyncOpenAI client, with entries missing from a grouped reply retried singly.
+    Requests are bounded by MAX_CONCURRENT_SOLUTIONS. on_done(done, total) runs on the
+    event loop after each unique solution, so it may update Streamlit elements."""
+    mistral_key = get_mistral_api_key_with_session()
+    use_mistral = MISTRAL_AVAILABLE and mistral_key
+    use_openai = OPENAI_AVAILABLE and api_key
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SOLUTIONS)
+    warnings = []
+    by_key = {}
+    
+    # One representative violation per distinct key, in first-seen order
+    keys = [
+        solution_cache_key(v.get('violationText', ''), v.get('violationType', ''), detected_language)
+        for v in violations
+    ]
+    unique = {}
+    for key, violation in zip(keys, violations):
+        unique.setdefault(key, violation)
+    
+    def finish(key, solution):
+        by_key[key] = solution
+        if on_done:
+            on_done(len(by_key), len(unique))
+    
+    async def mistral_one(key, violation):
+        prompt = create_solution_prompt(
+            violation.get('violationText', ''), violation.get('violationType', ''),
+            violation.get('explanation', ''), detected_language
         )
-        
-        solution = response.choices[0].message.content.strip()
-        # Ensure Unicode is properly handled
-        return safe_unicode_text(solution)
-        
-    except Exception as e:
-        error_msg = str(e)
-        if "billing_not_active" in error_msg:
-            return f"❌ OpenAI billing issue: {error_msg}. Please check your billing at https://platform.openai.com/account/billing"
-        elif "quota" in error_msg.lower():
-            return f"❌ OpenAI quota exceeded: {error_msg}"
+        async with semaphore:
+            solution, warning = await asyncio.to_thread(request_mistral_solution, prompt, mistral_key)
+        if warning:
+            warnings.append(warning)
+        if solution is not None:
+            store_cached_solution(key, solution)
+            finish(key, solution)
+    
+    async def openai_one(client, key, violation):
+        async with semaphore:
+            try:
+                await asyncio.to_thread(get_rate_limiter('openai').acquire)
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=solution_messages(
+                        violation.get('violationText', ''), violation.get('violationType', ''),
+                        violation.get('explanation', ''), detected_language
+                    ),
+                    max_tokens=300,
+                    temperature=0.3
+                )
+                solution = safe_unicode_text(response.choices[0].message.content.strip())
+            except Exception as e:
+                finish(key, solution_error_message(e))
+                return
+        store_cached_solution(key, solution)
+        finish(key, solution)
+    
+    async def openai_group(client, group):
+        if len(group) == 1:
+            await openai_one(client, *group[0])
+            return
+        async with semaphore:
+            try:
+                await asyncio.to_thread(get_rate_limiter('openai').acquire)
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=solution_group_messages([violation for _, violation in group], detected_language),
+                    max_tokens=300 * len(group),
+                    temperature=0.3,
+                    response_format=SOLUTION_GROUP_RESPONSE_FORMAT
+                )
+            except Exception as e:
+                # The whole group shares the failure (billing, quota...) - don't retry each one
+                for key, _ in group:
+                    finish(key, solution_error_message(e))
+                return
+        parsed = load_reply_json(response.choices[0].message.content or '')
+        by_index = {}
+        if isinstance(parsed, dict) and isinstance(parsed.get('solutions'), list):
+            for entry in parsed['solutions']:
+                if isinstance(entry, dict) and isinstance(entry.get('solution'), str) and entry['solution'].strip():
+                    by_index[entry.get('index')] = entry['solution']
+        retry = []
+        for k, (key, violation) in enumerate(group, 1):
+            if k in by_index:
+                solution = safe_unicode_text(by_index[k].strip())
+                store_cached_solution(key, solution)
+                finish(key, solution)
+            else:
+                retry.append((key, violation))
+        # A truncated reply or a skipped entry falls back to one request per violation
+        await asyncio.gather(*(openai_one(client, key, violation) for key, violation in retry))
+    
+    pending = []
+    for key, violation in unique.items():
+        solution = get_cached_solution(key)
+        if solution is not None:
+            finish(key, solution)
         else:
-            return f"Error generating solution: {error_msg}"
+            pending.append((key, violation))
+    
+    if use_mistral and pending:
+        await asyncio.gather(*(mistral_one(key, violation) for key, violation in pending))
+        pending = [(key, violation) for key, violation in pending if key not in by_key]
+    
+    if pending and not use_openai:
+        for key, _ in pending:
+            finish(key, "AI solution generation not available")
+    elif pending:
+        # One client per batch: the async client is tied to the event loop asyncio.run() creates
+        async with AsyncOpenAI(api_key=api_key) as client:
+            await asyncio.gather(*(
+                openai_group(client, pending[start:start + SOLUTIONS_PER_REQUEST])
+                for start in range(0, len(pending), SOLUTIONS_PER_REQUEST)
+            ))
+    return [by_key[key] for key in keys], warnings
+
+_PAGE_MARKER_RE = re.compile(r'=== ORIGINAL PAGE (\d+) ===')
+
+def _iter_lines(text):
+    """Yield the lines of text one slice at a time, without building the full split list"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def _iter_page_sections(source):
+    """(page_num, page_text) sections of a text with page markers, or of an iterable of pages
+    
+    Text before the first marker of a string source is yielded with page_num None."""
+    if not isinstance(source, str):
+        yield from source
+        return
+    start = 0
+    page_num = None
+    for match in _PAGE_MARKER_RE.finditer(source):
+        yield page_num, source[start:match.start()]
+        page_num = int(match.group(1))
+        start = match.end()
+    yield page_num, source[start:]
 
-def chunk_text(text, max_chars=3000):  # Reduced chunk size for better analysis
-    """Split text into analysis chunks while preserving screenplay structure"""
-    if len(text) <= max_chars:
-        return [text]
+def chunk_text(source, max_chars=MAX_CHARS_PER_CHUNK):
+    """Split text into analysis chunks while preserving screenplay structure
+    
+    Whole pages are packed greedily into chunks of up to max_chars, so a page never
+    straddles two chunks unless it is larger than a chunk on its own; such pages are
+    split on line boundaries. source may be the full text or an iterable of
+    (page_num, page_text), e.g. iter_pdf_pages(), consumed one page at a time."""
+    if isinstance(source, str) and len(source) <= max_chars:
+        return [source]
     
     chunks = []
     
-    # Split by lines first to preserve screenplay structure
-    lines = text.split('\n')
-    current_chunk = ""
+    # Lines are buffered in a list with a running length instead of growing a string
+    current_lines = []
+    current_len = 0
     
-    for line in lines:
-        line = line.strip()
-        if not line:
+    for page_num, page_text in _iter_page_sections(source):
+        lines = [line for line in (line.strip() for line in _iter_lines(page_text)) if line]
+        if page_num is not None:
+            lines.insert(0, f"=== ORIGINAL PAGE {page_num} ===")
+        if not lines:
             continue
-            
-        # Check if adding this line would exceed max_chars
-        if len(current_chunk + line + '\n') > max_chars and current_chunk:
-            # Save current chunk
-            chunks.append(current_chunk.strip())
-            current_chunk = line + '\n'
-        else:
-            current_chunk += line + '\n'
+        page_len = sum(len(line) + 1 for line in lines)
+        
+        # Start a new chunk rather than splitting a page that fits in one
+        if current_len + page_len > max_chars and current_lines:
+            chunks.append('\n'.join(current_lines))
+            current_lines = []
+            current_len = 0
+        
+        if page_len <= max_chars:
+            current_lines.extend(lines)
+            current_len += page_len
+            continue
+        
+        # Oversized page: fall back to packing its lines
+        for line in lines:
+            if current_len + len(line) + 1 > max_chars and current_lines:
+                chunks.append('\n'.join(current_lines))
+                current_lines = []
+                current_len = 0
+            current_lines.append(line)
+            current_len += len(line) + 1
     
     # Add remaining chunk
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+    if current_lines:
+        chunks.append('\n'.join(current_lines))
     
     # Ensure no chunk is too small (merge small chunks)
     final_chunks = []
@@ -1142,10 +1987,8 @@ def chunk_text(text, max_chars=3000):  # Reduced chunk size for better analysis
     
     return final_chunks
 
-def create_analysis_prompt():
-    """Create aggressive violation detection prompt for comprehensive script analysis"""
-    
-    return """You are an S&P Compliance Reviewer for hoichoi. Your job is to ACTIVELY FIND and FLAG violations in this screenplay/script content. Be thorough and aggressive in detecting violations - err on the side of flagging rather than missing violations.
+# The analysis prompt is static, so it is assembled once at import and shared by every chunk
+_ANALYSIS_PROMPT = """You are an S&P Compliance Reviewer for hoichoi. Your job is to ACTIVELY FIND and FLAG violations in this screenplay/script content. Be thorough and aggressive in detecting violations - err on the side of flagging rather than missing violations.
 
 ANALYZE EVERYTHING: Dialogues, scene descriptions, action lines, character names, props, settings, visual elements, transitions, and any other screenplay content.
 
@@ -1193,6 +2036,9 @@ ANALYZE EVERYTHING: Dialogues, scene descriptions, action lines, character names
 - Check for subtle discriminatory language
 - Look for brand names, logos, or commercial elements
 
+📋 RULE REFERENCE (highest risk first):
+""" + _RULE_REFERENCE + """
+
 Return violations in this JSON format:
 {
   "violations": [
@@ -1209,7 +2055,187 @@ Return violations in this JSON format:
 
 REMEMBER: Your job is to FIND violations, not to excuse them. Be thorough, be aggressive, be comprehensive. Analyze every element of the screenplay."""
 
-def analyze_chunk_with_mistral(chunk, chunk_num, total_chunks, api_key):
+def create_analysis_prompt():
+    """Create aggressive violation detection prompt for comprehensive script analysis"""
+    return _ANALYSIS_PROMPT
+
+# System messages carry the whole static prompt and stay byte-identical across chunks and
+# documents (no file names, timestamps or user data), so the provider can cache the prefix.
+# Only the chunk-specific part goes in the user message
+_OPENAI_SYSTEM_PROMPT = "You are an S&P compliance reviewer. Find violations and return them in JSON format.\n\n" + _ANALYSIS_PROMPT
+_MISTRAL_SYSTEM_PROMPT = "You are an aggressive S&P compliance reviewer specializing in Indian content. Your job is to FIND violations. Be thorough and flag everything that could potentially violate guidelines. You understand Bengali, Hindi, and other Indian languages. Better to over-detect than miss violations.\n\n" + _ANALYSIS_PROMPT
+
+# OpenAI structured outputs: with a strict JSON schema the reply is guaranteed to parse and
+# every violation carries every field, with a known type, severity and location
+_VIOLATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "violationText": {"type": "string"},
+        "violationType": {"type": "string", "enum": list(_RULE_IDS)},
+        "explanation": {"type": "string"},
+        "suggestedAction": {"type": "string"},
+        "severity": {"type": "string", "enum": ["critical", "high", "medium", "low"]},
+        "location": {
+            "type": "string",
+            "enum": ["dialogue", "scene_description", "action_line", "character_name", "prop", "setting", "other"]
+        }
+    },
+    "required": ["violationText", "violationType", "explanation", "suggestedAction", "severity", "location"],
+    "additionalProperties": False
+}
+_VIOLATIONS_LIST_SCHEMA = {"type": "array", "items": _VIOLATION_SCHEMA}
+
+VIOLATIONS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "violations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"violations": _VIOLATIONS_LIST_SCHEMA},
+            "required": ["violations"],
+            "additionalProperties": False
+        }
+    }
+}
+
+CHUNK_GROUP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "chunk_violations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "chunk_index": {"type": "integer"},
+                            "violations": _VIOLATIONS_LIST_SCHEMA
+                        },
+                        "required": ["chunk_index", "violations"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+class ViolationStreamParser:
+    """Incrementally pull complete violation objects out of a streamed {"violations": [...]} reply
+    
+    Every "violations" array is read in turn, so grouped {"results": [...]} replies stream too;
+    there the chunk_index written before an entry's array says which chunk it belongs to."""
+    _decoder = json.JSONDecoder()
+    _array_start = re.compile(r'"violations"\s*:\s*\[')
+    _chunk_index = re.compile(r'"chunk_index"\s*:\s*(\d+)')
+    
+    def __init__(self):
+        self.parts = []
+        self.buffer = ''
+        self.pos = None  # Index inside the current violations array once it has been seen
+        self.chunk_index = None  # chunk_index of the current array's entry, if it came first
+    
+    def feed(self, text):
+        """Add streamed text and return (chunk_index, violation) pairs completed by it"""
+        self.parts.append(text)
+        self.buffer += text
+        
+        found = []
+        while True:
+            if self.pos is None:
+                match = self._array_start.search(self.buffer)
+                if not match:
+                    break
+                self.pos = match.end()
+                # Only the entry object this array opens in, not an earlier entry's index
+                entry_head = self.buffer[self.buffer.rfind('{', 0, match.start()) + 1:match.start()]
+                index_match = self._chunk_index.search(entry_head)
+                self.chunk_index = int(index_match.group(1)) if index_match else None
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n,':
+                self.pos += 1
+            if self.pos >= len(self.buffer):
+                break
+            if self.buffer[self.pos] == ']':
+                # Array finished - drop it and look for the next one
+                self.buffer = self.buffer[self.pos + 1:]
+                self.pos = None
+                continue
+            try:
+                obj, self.pos = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                break  # Object still incomplete - wait for more text
+            if isinstance(obj, dict):
+                found.append((self.chunk_index, obj))
+        return found
+    
+    def text(self):
+        return ''.join(self.parts)
+
+class StreamTally:
+    """Forward streamed violations to on_violation(chunk_num, violation), counting them per chunk
+    
+    withdraw() reports each forwarded violation again with None in its place, for replies
+    that are discarded and re-requested, so live counts don't include them twice."""
+    def __init__(self, on_violation):
+        self.on_violation = on_violation
+        self.counts = Counter()
+    
+    def __call__(self, chunk_num, violation):
+        self.counts[chunk_num] += 1
+        self.on_violation(chunk_num, violation)
+    
+    def withdraw(self):
+        for chunk_num, count in self.counts.items():
+            for _ in range(count):
+                self.on_violation(chunk_num, None)
+        self.counts.clear()
+
+def stream_violations(deltas, chunk_nums, on_violation=None, close=None):
+    """Consume streamed text deltas, reporting each violation as soon as it is complete
+    
+    on_violation is called with (chunk_num, violation); a grouped reply's chunk_index k maps
+    to chunk_nums[k - 1], and violations of an unknown chunk go to the first one.
+    A reply that has not opened a JSON object after STREAM_ABORT_CHARS characters (a refusal
+    or prose answer) will never parse, so the stream is closed early and '' returned instead
+    of paying for the rest of max_tokens."""
+    parser = ViolationStreamParser()
+    opened = False
+    for delta in deltas:
+        for chunk_index, violation in parser.feed(delta):
+            if on_violation:
+                in_group = chunk_index is not None and 1 <= chunk_index <= len(chunk_nums)
+                on_violation(chunk_nums[chunk_index - 1] if in_group else chunk_nums[0], violation)
+        if not opened:
+            opened = '{' in parser.buffer
+            if not opened and len(parser.buffer) > STREAM_ABORT_CHARS:
+                if close:
+                    close()
+                return ''
+    return parser.text().strip()
+
+def iter_mistral_deltas(response):
+    """Yield content deltas from a streamed Mistral chat completion (server-sent events)"""
+    response.encoding = 'utf-8'  # SSE responses carry no charset; keep Bengali intact
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            break
+        try:
+            delta = json_loads(data)['choices'][0]['delta'].get('content')
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        if delta:
+            yield delta
+
+def analyze_chunk_with_mistral(chunk, chunk_num, total_chunks, api_key, on_violation=None):
     """Analyze single chunk with Mistral API - ENHANCED with better error handling"""
     if not MISTRAL_AVAILABLE or not api_key:
         return {"violations": []}
@@ -1222,11 +2248,7 @@ def analyze_chunk_with_mistral(chunk, chunk_num, total_chunks, api_key):
             "Authorization": f"Bearer {api_key}"
         }
         
-        prompt = create_analysis_prompt()
-        
-        full_prompt = f"""{prompt}
-
-CONTENT TO ANALYZE (Chunk {chunk_num}/{total_chunks}):
+        chunk_prompt = f"""{keyword_hint(chunk)}CONTENT TO ANALYZE (Chunk {chunk_num}/{total_chunks}):
 {chunk}
 
 INSTRUCTIONS:
@@ -1244,51 +2266,24 @@ JSON RESPONSE:"""
             "messages": [
                 {
                     "role": "system", 
-                    "content": "You are an aggressive S&P compliance reviewer specializing in Indian content. Your job is to FIND violations. Be thorough and flag everything that could potentially violate guidelines. You understand Bengali, Hindi, and other Indian languages. Better to over-detect than miss violations."
+                    "content": _MISTRAL_SYSTEM_PROMPT
                 },
                 {
                     "role": "user", 
-                    "content": full_prompt
+                    "content": chunk_prompt
                 }
             ],
             "max_tokens": 1500,
-            "temperature": 0.1
+            "temperature": 0.1,
+            "stream": True
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=90)
+        get_rate_limiter('mistral').acquire()
+        response = get_mistral_session().post(url, json=payload, headers=headers, timeout=90, stream=True)
         
         if response.status_code == 200:
-            result = response.json()
-            content = result['choices'][0]['message']['content'].strip()
-            
-            # Parse JSON response
-            try:
-                parsed_result = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from the response
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    try:
-                        parsed_result = json.loads(json_match.group())
-                    except:
-                        return {"violations": []}
-                else:
-                    return {"violations": []}
-            
-            # Ensure violations are properly formatted with Unicode handling
-            if 'violations' in parsed_result and isinstance(parsed_result['violations'], list):
-                valid_violations = []
-                for violation in parsed_result['violations']:
-                    if isinstance(violation, dict) and 'violationText' in violation and 'violationType' in violation:
-                        # FIXED: Preserve exact Bengali text
-                        violation['violationText'] = violation.get('violationText', '')
-                        violation['explanation'] = violation.get('explanation', 'S&P violation detected')
-                        violation['suggestedAction'] = violation.get('suggestedAction', 'Review and modify content')
-                        violation.setdefault('severity', 'medium')
-                        violation.setdefault('location', 'content')
-                        valid_violations.append(violation)
-                
-                return {"violations": valid_violations}
+            content = stream_violations(iter_mistral_deltas(response), [chunk_num], on_violation, response.close)
+            return parse_violations_reply(content)
         elif response.status_code == 429:
             st.error(f"🚨 **Mistral API Rate Limit**: Chunk {chunk_num} - Too many requests")
             return {"violations": []}
@@ -1299,23 +2294,153 @@ JSON RESPONSE:"""
             st.warning(f"Mistral API error for chunk {chunk_num}: {response.status_code}")
             return {"violations": []}
         
-        return {"violations": []}
-        
     except Exception as e:
         st.error(f"Error analyzing chunk {chunk_num} with Mistral: {e}")
         return {"violations": []}
 
+def load_reply_json(content):
+    """Parse a model reply as JSON, falling back to the outermost {...} in it; None if neither parses"""
+    try:
+        return json_loads(content)
+    except ValueError:
+        # Try to extract JSON from the response
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if not json_match:
+            return None
+        try:
+            return json_loads(json_match.group())
+        except:
+            return None
+
+def parse_violations_reply(content):
+    """Parse a model reply into {"violations": [...]}, keeping only well-formed violations"""
+    return validate_violations(load_reply_json(content))
+
+def validate_violations(parsed_result):
+    """{"violations": [...]} with only the well-formed violations of a parsed reply object"""
+    # Ensure violations are properly formatted with Unicode handling
+    valid_violations = []
+    if isinstance(parsed_result, dict) and isinstance(parsed_result.get('violations'), list):
+        for violation in parsed_result['violations']:
+            if isinstance(violation, dict) and 'violationText' in violation and 'violationType' in violation:
+                # FIXED: Preserve exact Bengali text
+                violation['violationText'] = violation.get('violationText', '')
+                violation['explanation'] = violation.get('explanation', 'S&P violation detected')
+                violation['suggestedAction'] = violation.get('suggestedAction', 'Review and modify content')
+                violation.setdefault('severity', 'medium')
+                violation.setdefault('location', 'content')
+                valid_violations.append(violation)
+    return {"violations": valid_violations}
+
+def openai_chunk_messages(chunk, chunk_num, total_chunks):
+    """Chat messages for analyzing one chunk with OpenAI (realtime and Batch API)"""
+    chunk_prompt = f"""{keyword_hint(chunk)}CONTENT TO ANALYZE (Chunk {chunk_num}/{total_chunks}):
+{chunk}
+
+Return violations in JSON format:"""
+    return [
+        {"role": "system", "content": _OPENAI_SYSTEM_PROMPT},
+        {"role": "user", "content": chunk_prompt}
+    ]
+
+# The on-disk caches are private to the server's user: see CACHE_DIR
+def make_private_dir(path):
+    """Create path (and any parents) and make sure only this user can read it"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
+
+def open_private_file(path):
+    """Open path for binary writing, creating it readable by this user only"""
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb')
+
+# Parsed chunk analyses persisted on disk, keyed by a hash of the chunk text, so unchanged
+# chunks of a re-uploaded or re-analyzed script cost no API call. One connection is shared
+# by all sessions and worker threads behind a lock; the cache is best effort throughout
+def chunk_cache_key(chunk):
+    return f"{_content_digest(chunk)}:{PROMPT_VERSION}"
+
+@st.cache_resource(show_spinner=False)
+def get_chunk_cache():
+    """The process-wide (sqlite connection, lock) pair, opened once rather than per rerun
+    
+    Entries older than CACHE_MAX_AGE_SECONDS are purged on open and ignored on lookup."""
+    make_private_dir(CACHE_DIR)
+    # Create the file 0o600 before sqlite opens it; its journal files copy these permissions
+    os.close(os.open(CHUNK_CACHE_PATH, os.O_RDWR | os.O_CREAT, 0o600))
+    db = sqlite3.connect(CHUNK_CACHE_PATH, check_same_thread=False)
+    with db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_analysis "
+            "(key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        db.execute("DELETE FROM chunk_analysis WHERE stored_at < ?", (time.time() - CACHE_MAX_AGE_SECONDS,))
+    return db, threading.Lock()
+
+def get_cached_chunk_analysis(chunk, chunk_num=None, on_violation=None):
+    """Return the stored analysis of an identical chunk, or None
+    
+    Cached violations are passed to on_violation so live progress counts them too. A row
+    that no longer parses (corrupt or an older format) is deleted and counts as a miss."""
+    key = chunk_cache_key(chunk)
+    try:
+        db, lock = get_chunk_cache()
+        with lock:
+            row = db.execute(
+                "SELECT result FROM chunk_analysis WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - CACHE_MAX_AGE_SECONDS)
+            ).fetchone()
+        if row is None:
+            return None
+        analysis = json_loads(row[0])
+        if not isinstance(analysis['violations'], list):
+            raise TypeError("cached violations are not a list")
+    except (sqlite3.Error, OSError):
+        return None
+    except (ValueError, KeyError, TypeError):
+        try:
+            with lock:
+                with db:
+                    db.execute("DELETE FROM chunk_analysis WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+        return None
+    if on_violation:
+        for violation in analysis['violations']:
+            on_violation(chunk_num, violation)
+    return analysis
+
+def store_chunk_analysis(chunk, analysis):
+    """Persist a successful chunk analysis (before callers add page numbers or solutions)"""
+    try:
+        db, lock = get_chunk_cache()
+        with lock:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO chunk_analysis (key, result, stored_at) VALUES (?, ?, ?)",
+                    (chunk_cache_key(chunk), json_dumps(analysis), time.time())
+                )
+    except (sqlite3.Error, OSError):
+        pass
+    return analysis
+
 # FIXED: Enhanced API error handling - Replace analyze_chunk function
-def analyze_chunk(chunk, chunk_num, total_chunks, api_key=None):
-    """Analyze single chunk with enhanced API error handling - FIXED"""
+def analyze_chunk(chunk, chunk_num, total_chunks, api_key=None, on_violation=None):
+    """Analyze single chunk with enhanced API error handling - FIXED
+    
+    on_violation, if given, is called with (chunk_num, violation) as each violation streams
+    in, and with None in place of violations from a reply that was given up on."""
+    cached = get_cached_chunk_analysis(chunk, chunk_num, on_violation)
+    if cached is not None:
+        return cached
+    streamed = StreamTally(on_violation) if on_violation else None
     
     # Try Mistral first
     mistral_api_key = get_mistral_api_key_with_session()
     if MISTRAL_AVAILABLE and mistral_api_key:
         try:
-            result = analyze_chunk_with_mistral(chunk, chunk_num, total_chunks, mistral_api_key)
+            result = analyze_chunk_with_mistral(chunk, chunk_num, total_chunks, mistral_api_key, streamed)
             if result and result.get('violations'):
-                return result
+                return store_chunk_analysis(chunk, result)
         except Exception as e:
             error_msg = str(e)
             st.warning(f"Mistral API issue for chunk {chunk_num}: {error_msg}")
@@ -1329,62 +2454,37 @@ def analyze_chunk(chunk, chunk_num, total_chunks, api_key=None):
                 st.error("🚨 **Mistral API Authentication Failed**: Please check your API key")
     
     # Fallback to OpenAI
+    if streamed:
+        streamed.withdraw()
     openai_api_key = get_api_key() if not api_key else api_key
     if OPENAI_AVAILABLE and openai_api_key:
         try:
-            client = OpenAI(api_key=openai_api_key)
-            
-            prompt = create_analysis_prompt()
-            
-            full_prompt = f"""{prompt}
-
-CONTENT TO ANALYZE (Chunk {chunk_num}/{total_chunks}):
-{chunk}
-
-Return violations in JSON format:"""
+            client = get_openai_client(openai_api_key)
             
+            get_rate_limiter('openai').acquire()
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an S&P compliance reviewer. Find violations and return them in JSON format."},
-                    {"role": "user", "content": full_prompt}
-                ],
+                messages=openai_chunk_messages(chunk, chunk_num, total_chunks),
                 temperature=0.1,
                 max_tokens=1500,
-                timeout=90
+                response_format=VIOLATIONS_RESPONSE_FORMAT,
+                timeout=90,
+                stream=True
             )
             
-            result = response.choices[0].message.content.strip()
-            
-            # Parse JSON response
-            try:
-                parsed_result = json.loads(result)
-            except json.JSONDecodeError:
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    try:
-                        parsed_result = json.loads(json_match.group())
-                    except:
-                        return {"violations": []}
-                else:
-                    return {"violations": []}
-            
-            # Ensure violations are properly formatted
-            if 'violations' in parsed_result and isinstance(parsed_result['violations'], list):
-                valid_violations = []
-                for violation in parsed_result['violations']:
-                    if isinstance(violation, dict) and 'violationText' in violation and 'violationType' in violation:
-                        # FIXED: Preserve exact Bengali text
-                        violation['violationText'] = violation.get('violationText', '')
-                        violation['explanation'] = violation.get('explanation', 'S&P violation detected')
-                        violation['suggestedAction'] = violation.get('suggestedAction', 'Review and modify content')
-                        violation.setdefault('severity', 'medium')
-                        violation.setdefault('location', 'content')
-                        valid_violations.append(violation)
-                
-                return {"violations": valid_violations}
-            
-            return {"violations": []}
+            result = stream_violations(
+                (event.choices[0].delta.content or '' for event in response if event.choices),
+                [chunk_num],
+                streamed,
+                response.close
+            )
+            # Only a complete reply is cached: an abandoned stream or a reply cut off at
+            # max_tokens would otherwise be stored as a clean chunk for every later run
+            parsed = load_reply_json(result) if result else None
+            analysis = validate_violations(parsed)
+            if isinstance(parsed, dict) and isinstance(parsed.get('violations'), list):
+                return store_chunk_analysis(chunk, analysis)
+            return analysis
             
         except Exception as e:
             error_msg = str(e)
@@ -1407,40 +2507,189 @@ Return violations in JSON format:"""
     
     # Final fallback - keyword based analysis
     st.warning(f"Using keyword-based analysis for chunk {chunk_num} due to API issues")
-    return analyze_chunk_with_keywords(chunk)
+    return {**analyze_chunk_with_keywords(chunk), "keywordFallback": True}
+
+def chunk_group_prompt(chunks_group, chunk_nums, total_chunks):
+    """User message for several chunks analyzed in one request"""
+    sections = [
+        f"=== CHUNK {k} (Chunk {chunk_num}/{total_chunks}) ===\n{keyword_hint(chunk)}{chunk}"
+        for k, (chunk, chunk_num) in enumerate(zip(chunks_group, chunk_nums), 1)
+    ]
+    return "\n\n".join(sections) + f"""
+
+Analyze each of the {len(chunks_group)} chunks above separately. Return JSON in this format, with one entry per chunk:
+{{"results": [{{"chunk_index": 1, "violations": [...]}}, {{"chunk_index": 2, "violations": [...]}}]}}
+Violations use the same fields as the single-chunk format, and violationText must be copied from its own chunk."""
+
+def request_chunk_group(chunks_group, chunk_nums, total_chunks, api_key=None, on_violation=None):
+    """Send several chunks in one request; returns the reply text, or None if the request failed"""
+    chunk_prompt = chunk_group_prompt(chunks_group, chunk_nums, total_chunks)
+    max_tokens = MAX_TOKENS_OUTPUT * len(chunks_group)
+    try:
+        mistral_api_key = get_mistral_api_key_with_session()
+        if MISTRAL_AVAILABLE and mistral_api_key:
+            get_rate_limiter('mistral').acquire()
+            response = get_mistral_session().post(
+                "https://api.mistral.ai/v1/chat/completions",
+                json={
+                    "model": "mistral-small",
+                    "messages": [
+                        {"role": "system", "content": _MISTRAL_SYSTEM_PROMPT},
+                        {"role": "user", "content": chunk_prompt}
+                    ],
+                    "max_tokens": max_tokens,
+                    "temperature": 0.1,
+                    "stream": True
+                },
+                headers={"Content-Type": "application/json", "Authorization": f"Bearer {mistral_api_key}"},
+                timeout=180,
+                stream=True
+            )
+            if response.status_code == 200:
+                return stream_violations(iter_mistral_deltas(response), chunk_nums, on_violation, response.close)
+            return None
+        
+        openai_api_key = get_api_key() if not api_key else api_key
+        if OPENAI_AVAILABLE and openai_api_key:
+            get_rate_limiter('openai').acquire()
+            response = get_openai_client(openai_api_key).chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": _OPENAI_SYSTEM_PROMPT},
+                    {"role": "user", "content": chunk_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=max_tokens,
+                response_format=CHUNK_GROUP_RESPONSE_FORMAT,
+                timeout=180,
+                stream=True
+            )
+            return stream_violations(
+                (event.choices[0].delta.content or '' for event in response if event.choices),
+                chunk_nums,
+                on_violation,
+                response.close
+            )
+    except Exception:
+        return None  # Errors are reported by the per-chunk fallback
+    return None
+
+def analyze_chunk_group(chunks_group, first_num, total_chunks, api_key=None, on_violation=None):
+    """Analyze consecutive chunks in one API request; returns one analysis per chunk
+    
+    Chunks with a cached analysis are left out of the request. If the grouped reply is
+    missing, truncated (not valid JSON) or lacks a chunk, the remaining chunks are
+    re-analyzed one request each with analyze_chunk, and the violations streamed from
+    the grouped reply are withdrawn first."""
+    analyses = [
+        get_cached_chunk_analysis(chunk, first_num + k, on_violation)
+        for k, chunk in enumerate(chunks_group)
+    ]
+    missing = [k for k, analysis in enumerate(analyses) if analysis is None]
+    if len(missing) > 1:
+        streamed = StreamTally(on_violation) if on_violation else None
+        parsed = load_reply_json(request_chunk_group(
+            [chunks_group[k] for k in missing], [first_num + k for k in missing], total_chunks, api_key, streamed
+        ) or '')
+        if isinstance(parsed, dict) and isinstance(parsed.get('results'), list):
+            by_index = {
+                entry.get('chunk_index'): validate_violations(entry)
+                for entry in parsed['results']
+                if isinstance(entry, dict) and isinstance(entry.get('violations'), list)
+            }
+            if all(j in by_index for j in range(1, len(missing) + 1)):
+                for j, k in enumerate(missing, 1):
+                    analyses[k] = store_chunk_analysis(chunks_group[k], by_index[j])
+                return analyses
+        if streamed:
+            streamed.withdraw()
+    
+    for k in missing:
+        analyses[k] = analyze_chunk(chunks_group[k], first_num + k, total_chunks, api_key, on_violation)
+    return analyses
+
+# OpenAI Batch API: half the price of realtime calls and a separate rate-limit pool,
+# in exchange for results that can take up to 24 hours
+BATCH_TERMINAL_STATUSES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+def submit_analysis_batch(chunks, api_key):
+    """Upload one chat-completion request per chunk as a Batch API job; returns the batch id"""
+    client = get_openai_client(api_key)
+    requests_jsonl = b"\n".join(
+        json_bytes({
+            "custom_id": f"chunk-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-4o-mini",
+                "messages": openai_chunk_messages(chunk, i + 1, len(chunks)),
+                "temperature": 0.1,
+                "max_tokens": MAX_TOKENS_OUTPUT,
+                "response_format": VIOLATIONS_RESPONSE_FORMAT
+            }
+        })
+        for i, chunk in enumerate(chunks)
+    )
+    batch_file = client.files.create(file=("analysis_batch.jsonl", requests_jsonl), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+def wait_for_batch(batch_id, api_key, max_wait=BATCH_WAIT_SECONDS):
+    """Poll a batch with exponential backoff until it finishes or max_wait seconds pass"""
+    client = get_openai_client(api_key)
+    deadline = time.monotonic() + max_wait
+    delay = 2
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        remaining = deadline - time.monotonic()
+        if batch.status in BATCH_TERMINAL_STATUSES or remaining <= 0:
+            return batch
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 60)
+
+def fetch_batch_results(batch, total_chunks, api_key):
+    """Per-chunk analyses from a completed batch, in chunk order; failed requests give no violations"""
+    results = [{"violations": []} for _ in range(total_chunks)]
+    if not batch.output_file_id:
+        return results
+    
+    output = get_openai_client(api_key).files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json_loads(line)
+        index = int(record['custom_id'].rsplit('-', 1)[1])
+        response = record.get('response') or {}
+        if response.get('status_code') == 200 and 0 <= index < total_chunks:
+            results[index] = parse_violations_reply(response['body']['choices'][0]['message']['content'])
+    return results
 
 def analyze_chunk_with_keywords(chunk):
     """Fallback keyword-based analysis when APIs fail"""
     violations = []
     
-    # Simple keyword-based detection
-    violation_keywords = {
-        "Personal_Information_Exposure": ["phone number", "mobile number", "address", "email"],
-        "OTT_Platform_Promotion": ["netflix", "amazon prime", "hotstar", "zee5", "sony liv"],
-        "National_Anthem_Misuse": ["national anthem", "jana gana mana"],
-        "Religious_Mockery": ["mock", "ridicule", "blasphemy"],
-        "Unauthorized_Branding": ["brand", "logo", "trademark"],
-    }
-    
-    chunk_lower = chunk.lower()
-    
-    for violation_type, keywords in violation_keywords.items():
-        for keyword in keywords:
-            if keyword in chunk_lower:
-                # Find the sentence containing the keyword
-                sentences = chunk.split('.')
-                for sentence in sentences:
-                    if keyword in sentence.lower():
-                        violations.append({
-                            'violationText': sentence.strip(),
-                            'violationType': violation_type,
-                            'explanation': f'Keyword detected: "{keyword}" - requires review',
-                            'suggestedAction': 'Review and modify content as needed',
-                            'severity': 'medium',
-                            'location': 'content'
-                        })
-                        break
-                break
+    # One pass over the chunk for all rule keywords (the Aho-Corasick automaton when
+    # available), then report the sentence around the first hit of each rule. Hits are
+    # sorted by position; the automaton also reports keywords nested in a longer one,
+    # so take the longest keyword at the first position, as the regex scan would
+    for violation_type, hits in scan_keywords_ac(chunk).items():
+        pos, keyword = min(hits, key=lambda hit: (hit[0], -len(hit[1])))
+        sentence_start = chunk.rfind('.', 0, pos) + 1
+        sentence_end = chunk.find('.', pos)
+        if sentence_end == -1:
+            sentence_end = len(chunk)
+        violations.append({
+            'violationText': chunk[sentence_start:sentence_end].strip(),
+            'violationType': violation_type,
+            'explanation': f'Keyword detected: "{keyword}" - requires review',
+            'suggestedAction': 'Review and modify content as needed',
+            'severity': _RULE_SEVERITIES[_RULE_INDEX[violation_type]],
+            'location': 'content'
+        })
     
     return {"violations": violations}
 
@@ -1458,8 +2707,138 @@ def find_page_number(violation_text, pages_data):
     
     return 1
 
-def analyze_document(text, pages_data, api_key=None):
-    """Analyze entire document with aggressive violation detection and better Unicode handling - ENHANCED"""
+def _page_search_key(violation_text):
+    """Prefix find_page_number falls back to when the full text is on no page"""
+    return violation_text[:50] if len(violation_text) > 50 else violation_text
+
+def assign_page_numbers(violations, pages_data):
+    """Set pageNumber on each violation, with the same result as find_page_number
+    
+    All violation texts and their prefixes are matched in one pass per page (Aho-Corasick
+    when available) instead of scanning every page once per violation."""
+    texts = {violation.get('violationText', '') for violation in violations}
+    patterns = (texts | {_page_search_key(text) for text in texts}) - {''}
+    first_page = {}  # Pattern -> first page containing it
+    if pages_data:
+        first_page[''] = pages_data[0].get('original_page', pages_data[0]['page_number'])
+    
+    remaining = set(patterns)
+    if AHOCORASICK_AVAILABLE and remaining:
+        automaton = ahocorasick.Automaton()
+        for pattern in remaining:
+            automaton.add_word(pattern, pattern)
+        automaton.make_automaton()
+    for page_data in pages_data:
+        if not remaining:
+            break
+        page_number = page_data.get('original_page', page_data['page_number'])
+        if AHOCORASICK_AVAILABLE:
+            found = {pattern for _, pattern in automaton.iter(page_data['text'])}
+        else:
+            found = {pattern for pattern in remaining if pattern in page_data['text']}
+        for pattern in found & remaining:
+            first_page[pattern] = page_number
+        remaining -= found
+    
+    for violation in violations:
+        text = violation.get('violationText', '')
+        page = first_page.get(text)
+        if page is None:
+            page = first_page.get(_page_search_key(text), 1)
+        violation['pageNumber'] = page
+
+def append_ndjson(handle, records):
+    """Append records to an open NDJSON file, one JSON object per line"""
+    for record in records:
+        handle.write(json_dumps(record) + '\n')
+    handle.flush()
+
+def read_ndjson(path):
+    """Yield records from an NDJSON file, skipping a truncated trailing line"""
+    try:
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json_loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
+
+def render_live_results(count_slot, table_area, new_violations, total):
+    """Show the violations streamed so far while the remaining chunks are analyzed
+    
+    Only the newly found violations are drawn, as one more table under the earlier ones."""
+    count_slot.caption(f"📝 {total} violations found so far")
+    with table_area:
+        st.dataframe(
+            [
+                {
+                    'Severity': v.get('severity', 'medium').upper(),
+                    'Type': v.get('violationType', 'Unknown'),
+                    'Chunk': v.get('chunkNumber', 'N/A'),
+                    'Text': v.get('violationText', '')[:120]
+                }
+                for v in new_violations
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
+def _remove_file(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def remove_orphan_files(directory):
+    """Delete files in directory older than ORPHAN_MAX_AGE_SECONDS"""
+    cutoff = time.time() - ORPHAN_MAX_AGE_SECONDS
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+class PartialResultsLog:
+    """NDJSON log of the violations an analysis has found so far, in the private cache dir
+    
+    The file is deleted by discard(), or when the session holding the log is dropped and
+    the object garbage collected."""
+    def __init__(self):
+        make_private_dir(CACHE_DIR)
+        make_private_dir(PARTIAL_RESULTS_DIR)
+        # Logs of sessions lost to a server restart are never discarded; sweep them by age
+        remove_orphan_files(PARTIAL_RESULTS_DIR)
+        fd, self.path = tempfile.mkstemp(suffix='.ndjson', dir=PARTIAL_RESULTS_DIR)  # Created 0o600
+        self.handle = os.fdopen(fd, 'w', encoding='utf-8')
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+    
+    def append(self, records):
+        append_ndjson(self.handle, records)
+    
+    def close(self):
+        self.handle.close()
+    
+    def discard(self):
+        self.handle.close()
+        self._finalizer()
+
+def discard_partial_results():
+    """Remove the partial results log of the current session"""
+    partial_results = st.session_state.pop('partial_results', None)
+    if partial_results is not None:
+        partial_results.discard()
+
+def analyze_document(text, pages_data, api_key=None, chunk_results=None):
+    """Analyze entire document with aggressive violation detection and better Unicode handling - ENHANCED
+    
+    chunk_results, if given, holds per-chunk analyses already produced (e.g. by a Batch
+    API job) and replaces the realtime API calls."""
     if not text:
         return {"violations": [], "summary": {}}
     
@@ -1472,7 +2851,7 @@ def analyze_document(text, pages_data, api_key=None):
         return {"violations": [], "summary": {}}
     
     # Show which API will be used
-    primary_api = "Mistral" if mistral_key else "OpenAI"
+    primary_api = "OpenAI Batch" if chunk_results is not None else "Mistral" if mistral_key else "OpenAI"
     st.info(f"🤖 **Primary API for Analysis:** {primary_api}")
     
     # Show text analysis debug info
@@ -1481,9 +2860,11 @@ def analyze_document(text, pages_data, api_key=None):
     with col1:
         st.metric("Total Characters", len(text))
     with col2:
-        st.metric("Total Lines", len(text.split('\n')))
+        st.metric("Total Lines", text.count('\n') + 1)
     with col3:
-        unicode_chars = sum(1 for char in text if ord(char) > 127)
+        text_blocks = codepoint_blocks(text)
+        text_counts = ScriptCounts(sum(text_blocks.values()), text_blocks[_BENGALI_BLOCK], text_blocks[_DEVANAGARI_BLOCK])
+        unicode_chars = text_counts.unicode
         st.metric("Unicode Characters", unicode_chars)
     
     # Show character distribution
@@ -1491,11 +2872,9 @@ def analyze_document(text, pages_data, api_key=None):
         st.success(f"✅ **Unicode Content Detected**: {unicode_chars} non-ASCII characters found")
         
         # Show character script analysis
-        script_analysis = {}
-        for char in text:
-            if ord(char) > 127:
-                script = get_script_range(char)
-                script_analysis[script] = script_analysis.get(script, 0) + 1
+        script_analysis = Counter()
+        for block, count in text_blocks.items():
+            script_analysis[get_block_script(block)] += count
         
         if script_analysis:
             st.markdown("**🔤 Script Analysis:**")
@@ -1507,124 +2886,180 @@ def analyze_document(text, pages_data, api_key=None):
             preview_text = text[:200]
             st.text(preview_text)
             # Show if Bengali characters are present
-            bengali_count = sum(1 for char in preview_text if '\u0980' <= char <= '\u09FF')
+            bengali_count = script_counts(preview_text).bengali
             if bengali_count > 0:
                 st.success(f"✅ Bengali characters detected: {bengali_count}")
     
     # Detect language with better feedback
-    detected_language = detect_language(text)
+    detected_language = cached_detect_language(text)
     st.info(f"🌐 **Content Language:** {detected_language} | 🔍 **Analysis Method:** Aggressive Detection | 📋 **Coverage:** Complete Script Analysis")
     
     chunks = chunk_text(text)
+    if chunk_results is not None and len(chunk_results) != len(chunks):
+        st.error("❌ Batch results do not match this document's chunks - please run the analysis again")
+        return {"violations": [], "summary": {}}
     all_violations = []
     successful_chunks = 0
+    keyword_fallback = False
     
     # Progress tracking
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    # Completed violations are streamed to an NDJSON log as each chunk returns, so
+    # results can be browsed while later chunks run and survive an interrupted run
+    discard_partial_results()
+    results_log = PartialResultsLog()
+    st.session_state.partial_results = results_log
+    live_count = st.empty()
+    live_table = st.container()
+    
     st.info(f"🔍 **Analyzing {len(chunks)} chunks** for comprehensive violation detection...")
     
-    for i, chunk in enumerate(chunks):
-        progress = (i + 1) / len(chunks)
-        progress_bar.progress(progress)
-        status_text.text(f"🔍 Analyzing chunk {i+1}/{len(chunks)} - Looking for violations...")
-        
-        # Show chunk analysis info
-        chunk_unicode = sum(1 for char in chunk if ord(char) > 127)
-        chunk_info = f"Chunk {i+1}: {len(chunk)} chars, {chunk_unicode} Unicode chars"
-        
-        # Show chunk preview for debugging
-        with st.expander(f"📄 {chunk_info}"):
-            st.text(chunk[:300] + "..." if len(chunk) > 300 else chunk)
-            if chunk_unicode > 0:
-                st.success(f"✅ Unicode content detected: {chunk_unicode} characters")
-                # Show Bengali character count specifically
-                bengali_count = sum(1 for char in chunk if '\u0980' <= char <= '\u09FF')
-                if bengali_count > 0:
-                    st.success(f"✅ Bengali characters detected: {bengali_count}")
-        
-        analysis = analyze_chunk(chunk, i+1, len(chunks))
-        
-        if 'violations' in analysis and analysis['violations']:
-            st.success(f"⚠️ Found {len(analysis['violations'])} violations in chunk {i+1}")
+    # Chunks are independent, so send them to the API concurrently and merge the
+    # results back in chunk order as they complete. Violations streamed by the API
+    # arrive on streamed_violations first, so the status line updates before a chunk finishes
+    streamed_violations = queue.Queue()
+    streamed_count = 0
+    executor = None
+    if chunk_results is None:
+        # CHUNKS_PER_REQUEST consecutive chunks share one request; each group's future
+        # resolves to a list with one analysis per chunk
+        executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CHUNKS, initializer=streamlit_worker_initializer())
+        group_futures = [
+            executor.submit(
+                analyze_chunk_group, chunks[start:start + CHUNKS_PER_REQUEST], start + 1, len(chunks),
+                on_violation=lambda chunk_num, violation: streamed_violations.put((chunk_num, violation))
+            )
+            for start in range(0, len(chunks), CHUNKS_PER_REQUEST)
+        ]
+    else:
+        # Precomputed results go through the same merge loop as already-finished futures
+        group_futures = []
+        for analysis in chunk_results:
+            future = Future()
+            future.set_result([analysis])
+            group_futures.append(future)
+    group_size = CHUNKS_PER_REQUEST if chunk_results is None else 1
+    
+    # A failed or interrupted merge must not leave the pool running or the log open
+    try:
+        for i, chunk in enumerate(chunks):
+            progress = (i + 1) / len(chunks)
+            progress_bar.progress(progress)
+            status_text.text(f"🔍 Analyzing chunk {i+1}/{len(chunks)} - Looking for violations...")
+            
+            # Show chunk analysis info
+            chunk_unicode = script_counts(chunk).unicode
+            chunk_info = f"Chunk {i+1}: {len(chunk)} chars, {chunk_unicode} Unicode chars"
+            
+            # Show chunk preview for debugging
+            with st.expander(f"📄 {chunk_info}"):
+                st.text(chunk[:300] + "..." if len(chunk) > 300 else chunk)
+                if chunk_unicode > 0:
+                    st.success(f"✅ Unicode content detected: {chunk_unicode} characters")
+                    # Show Bengali character count specifically
+                    bengali_count = script_counts(chunk).bengali
+                    if bengali_count > 0:
+                        st.success(f"✅ Bengali characters detected: {bengali_count}")
+            
+            chunk_future = group_futures[i // group_size]
+            while not wait([chunk_future], timeout=0.25).done:
+                while not streamed_violations.empty():
+                    chunk_num, violation = streamed_violations.get_nowait()
+                    if violation is None:
+                        # A discarded reply's violation - the chunk is being analyzed again
+                        streamed_count -= 1
+                        continue
+                    streamed_count += 1
+                    status_text.text(
+                        f"🔍 Analyzing chunk {i+1}/{len(chunks)} - ⚡ {streamed_count} violations streamed so far "
+                        f"(latest: {violation.get('violationType', 'Unknown')} in chunk {chunk_num})"
+                    )
+            analysis = chunk_future.result()[i % group_size]
+            keyword_fallback = keyword_fallback or analysis.get('keywordFallback', False)
             
-            # Show violation details
-            for j, violation in enumerate(analysis['violations']):
-                violation_text = violation.get('violationText', '')
-                violation_unicode = sum(1 for char in violation_text if ord(char) > 127)
-                bengali_count = sum(1 for char in violation_text if '\u0980' <= char <= '\u09FF')
-                st.write(f"   → Violation {j+1}: {violation.get('violationType', 'Unknown')} ({len(violation_text)} chars, {violation_unicode} Unicode, {bengali_count} Bengali)")
+            if 'violations' in analysis and analysis['violations']:
+                st.success(f"⚠️ Found {len(analysis['violations'])} violations in chunk {i+1}")
                 
-                violation['pageNumber'] = find_page_number(violation_text, pages_data)
-                violation['chunkNumber'] = i + 1
-                violation['detectedLanguage'] = detected_language
-                violation['unicodeChars'] = violation_unicode
-                violation['bengaliChars'] = bengali_count
-                all_violations.append(violation)
-            successful_chunks += 1
-        else:
-            st.info(f"✅ No violations found in chunk {i+1}")
+                # Show violation details
+                for j, violation in enumerate(analysis['violations']):
+                    violation_text = violation.get('violationText', '')
+                    violation_unicode, bengali_count, _ = script_counts(violation_text)
+                    st.write(f"   → Violation {j+1}: {violation.get('violationType', 'Unknown')} ({len(violation_text)} chars, {violation_unicode} Unicode, {bengali_count} Bengali)")
+                    
+                    violation['chunkNumber'] = i + 1
+                    violation['detectedLanguage'] = detected_language
+                    violation['unicodeChars'] = violation_unicode
+                    violation['bengaliChars'] = bengali_count
+                    all_violations.append(violation)
+                successful_chunks += 1
+                
+                results_log.append(analysis['violations'])
+                render_live_results(live_count, live_table, analysis['violations'], len(all_violations))
+            else:
+                st.info(f"✅ No violations found in chunk {i+1}")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        results_log.close()
+    
+    # Pages are assigned once for the whole document - one matcher and one pass over the pages
+    assign_page_numbers(all_violations, pages_data)
+    
+    # Remove duplicates but be less aggressive about it - before generating solutions,
+    # so no request is spent on a violation that is about to be dropped
+    # Create a more lenient duplicate detection - only the first 50 chars are compared;
+    # setdefault keeps the first violation per key and dicts keep insertion order
+    first_by_key = {}
+    for violation in all_violations:
+        first_by_key.setdefault((violation.get('violationText', '')[:50], violation.get('violationType', '')), violation)
+    unique_violations = list(first_by_key.values())
     
     # Generate AI solutions for violations
-    if all_violations:
+    if unique_violations:
         status_text.text("🤖 Generating AI solutions for violations...")
-        solution_errors = 0
         
-        for i, violation in enumerate(all_violations):
-            progress = (i + 1) / len(all_violations)
-            progress_bar.progress(progress)
+        try:
+            solutions, solution_warnings = asyncio.run(generate_ai_solutions_batch(
+                unique_violations,
+                detected_language,
+                mistral_key or openai_key,
+                on_done=lambda done, total: progress_bar.progress(done / total)
+            ))
+        except Exception as e:
+            solutions = [f"Error generating solution: {str(e)}"] * len(unique_violations)
+            solution_warnings = []
+        
+        # Repeated warnings (e.g. a rate limit) are shown once
+        for warning in dict.fromkeys(solution_warnings):
+            st.warning(warning)
+        
+        for violation, ai_solution in zip(unique_violations, solutions):
+            violation['aiSolution'] = ai_solution
             
-            try:
-                ai_solution = generate_ai_solution(
-                    violation.get('violationText', ''),
-                    violation.get('violationType', ''),
-                    violation.get('explanation', ''),
-                    detected_language,
-                    mistral_key or openai_key
-                )
-                violation['aiSolution'] = ai_solution
-                
-                # Check if AI solution has Unicode
-                solution_unicode = sum(1 for char in ai_solution if ord(char) > 127)
-                solution_bengali = sum(1 for char in ai_solution if '\u0980' <= char <= '\u09FF')
-                violation['aiSolutionUnicode'] = solution_unicode
-                violation['aiSolutionBengali'] = solution_bengali
-                
-            except Exception as e:
-                solution_errors += 1
-                violation['aiSolution'] = f"Error generating solution: {str(e)}"
-                violation['aiSolutionUnicode'] = 0
-                violation['aiSolutionBengali'] = 0
+            # Check if AI solution has Unicode
+            solution_unicode, solution_bengali, _ = script_counts(ai_solution)
+            violation['aiSolutionUnicode'] = solution_unicode
+            violation['aiSolutionBengali'] = solution_bengali
         
+        # Failed violations come back as error strings rather than exceptions
+        solution_errors = sum(1 for solution in solutions if is_solution_error(solution))
         if solution_errors > 0:
             st.warning(f"⚠️ {solution_errors} AI solution generation errors occurred")
     
     progress_bar.progress(1.0)
     status_text.text(f"✅ Analysis complete! Found {len(all_violations)} violations across {len(chunks)} chunks")
     
-    # Remove duplicates but be less aggressive about it
-    unique_violations = []
-    seen_violations = set()
-    
-    for violation in all_violations:
-        v_text = violation.get('violationText', '')
-        v_type = violation.get('violationType', '')
-        
-        # Create a more lenient duplicate detection
-        duplicate_key = (v_text[:50], v_type)  # Only check first 50 chars for similarity
-        
-        if duplicate_key not in seen_violations:
-            seen_violations.add(duplicate_key)
-            unique_violations.append(violation)
-    
     # Sort by severity and page
-    severity_order = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1}
     unique_violations.sort(key=lambda x: (
-        -severity_order.get(x.get('severity', 'low'), 1),  # Sort by severity first
+        _SEVERITY_ORDER.get(x.get('severity', 'low'), 3),  # Sort by severity first
         x.get('pageNumber', 0)  # Then by page number
     ))
     
+    # Analysis finished cleanly - the partial results log is no longer needed
+    discard_partial_results()
+    
     return {
         "violations": unique_violations,
         "detectedLanguage": detected_language,
@@ -1634,20 +3069,26 @@ def analyze_document(text, pages_data, api_key=None):
             "chunksAnalyzed": len(chunks),
             "chunksWithViolations": successful_chunks,
             "successRate": f"{(successful_chunks/len(chunks)*100):.1f}%" if chunks else "0%",
-            "unicodeChars": sum(1 for char in text if ord(char) > 127),
-            "bengaliChars": sum(1 for char in text if '\u0980' <= char <= '\u09FF'),
+            "unicodeChars": text_counts.unicode,
+            "bengaliChars": text_counts.bengali,
             "totalChars": len(text),
-            "primaryAPI": primary_api
+            "primaryAPI": primary_api,
+            "keywordFallback": keyword_fallback
         }
     }
 
 # FIXED: Excel generation with proper Bengali text preservation
+@st.cache_data(max_entries=32, show_spinner=False)
 def generate_excel_report(violations, filename):
     """Generate Excel report with Bengali text preservation - FIXED"""
     if not EXCEL_AVAILABLE:
         st.error("Excel generation not available. Please install openpyxl.")
         return None
     
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+    
     try:
         # Create workbook and worksheet
         wb = Workbook()
@@ -1661,6 +3102,9 @@ def generate_excel_report(violations, filename):
             'AI Solution', 'Language', 'Location', 'Status'
         ]
         
+        # Widest value per column, tracked while writing so the widths need no second pass over the cells
+        column_widths = [len(header) for header in headers]
+        
         # Add headers
         for col_num, header in enumerate(headers, 1):
             cell = ws.cell(row=1, column=col_num, value=header)
@@ -1694,32 +3138,25 @@ def generate_excel_report(violations, filename):
                 cell = ws.cell(row=row_num, column=col_num, value=value)
                 # Set text alignment for better readability
                 cell.alignment = Alignment(wrap_text=True, vertical='top')
+                if value and len(str(value)) > column_widths[col_num - 1]:
+                    column_widths[col_num - 1] = len(str(value))
         
         # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    cell_value = str(cell.value) if cell.value else ""
-                    if len(cell_value) > max_length:
-                        max_length = len(cell_value)
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 80)  # Increased max width for Bengali
-            ws.column_dimensions[column_letter].width = adjusted_width
+        for col_num, max_length in enumerate(column_widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = min(max_length + 2, 80)  # Increased max width for Bengali
         
         # Create summary sheet
         summary_ws = wb.create_sheet("Summary")
         
         # Summary data
+        severity_counts = Counter(v.get('severity') for v in violations)
         summary_data = [
             ['Metric', 'Count'],
             ['Total Violations', len(violations)],
-            ['Critical', len([v for v in violations if v.get('severity') == 'critical'])],
-            ['High', len([v for v in violations if v.get('severity') == 'high'])],
-            ['Medium', len([v for v in violations if v.get('severity') == 'medium'])],
-            ['Low', len([v for v in violations if v.get('severity') == 'low'])],
+            ['Critical', severity_counts['critical']],
+            ['High', severity_counts['high']],
+            ['Medium', severity_counts['medium']],
+            ['Low', severity_counts['low']],
             ['Content Language', violations[0].get('detectedLanguage', 'Unknown') if violations else 'Unknown'],
             ['Unicode Characters', sum(v.get('unicodeChars', 0) for v in violations)],
             ['Bengali Characters', sum(v.get('bengaliChars', 0) for v in violations)]
@@ -1745,6 +3182,8 @@ def generate_excel_report(violations, filename):
 
 def create_unicode_paragraph(text, style, detected_language='English'):
     """Create a paragraph with proper Unicode support"""
+    from reportlab.platypus import Paragraph
+    
     try:
         # Handle Unicode text properly
         if isinstance(text, str):
@@ -1758,12 +3197,18 @@ def create_unicode_paragraph(text, style, detected_language='English'):
         # Fallback to basic text if Unicode fails
         return Paragraph(str(text).encode('ascii', errors='ignore').decode('ascii'), style)
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def generate_violations_report_pdf(violations, filename):
     """Generate PDF report with ACTUAL Bengali text - FINAL FIX"""
     if not PDF_AVAILABLE:
         st.error("PDF generation not available. Please install reportlab.")
         return None
     
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import Color
+    
     try:
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
@@ -1789,14 +3234,11 @@ def generate_violations_report_pdf(violations, filename):
         story.append(Spacer(1, 20))
         
         # Summary by severity
-        severity_counts = {}
-        for v in violations:
-            severity = v.get('severity', 'medium')
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_counts = Counter(v.get('severity', 'medium') for v in violations)
         
         story.append(Paragraph("VIOLATION SUMMARY BY SEVERITY", styles['Heading2']))
         for severity in ['critical', 'high', 'medium', 'low']:
-            count = severity_counts.get(severity, 0)
+            count = severity_counts[severity]
             if count > 0:
                 story.append(Paragraph(f"• {severity.upper()}: {count} violations", styles['Normal']))
         
@@ -1867,12 +3309,77 @@ def generate_violations_report_pdf(violations, filename):
         st.error(f"Error generating violations report PDF: {e}")
         return None
 
+def build_violation_prefilter(violation_texts, size=HIGHLIGHT_SHINGLE_SIZE):
+    """Index violation shingles so clean paragraphs can skip the per-violation scan
+    
+    A paragraph containing a violation of at least 2*size-1 characters always has a
+    window starting at a multiple of `size` that equals one of the violation's first
+    `size` shingles, so sampling paragraphs at that stride never misses a match.
+    Shorter violations are returned separately and checked directly.
+    """
+    shingles = set()
+    short_texts = []
+    for v_text in violation_texts:
+        if len(v_text) >= 2 * size - 1:
+            shingles.update(v_text[i:i + size] for i in range(size))
+        else:
+            short_texts.append(v_text)
+    return shingles, short_texts
+
+def paragraph_may_contain_violation(para_text, shingles, short_texts, size=HIGHLIGHT_SHINGLE_SIZE):
+    """Cheap pre-check before scanning a paragraph for every violation text"""
+    if any(para_text[i:i + size] in shingles for i in range(0, len(para_text) - size + 1, size)):
+        return True
+    return any(v_text in para_text for v_text in short_texts)
+
+def build_violation_matcher(violation_map):
+    """Return a function giving the violation text that decides a paragraph's highlight, or None
+    
+    The highest-severity violation contained in the paragraph wins, the earliest in
+    violation_map on ties. With pyahocorasick one automaton pass per paragraph finds every
+    candidate, nested and overlapping ones included; otherwise the shingle prefilter and
+    a regex alternation rule paragraphs out before the texts are checked in rank order."""
+    rank = {
+        v_text: (_SEVERITY_ORDER.get(v_info['severity'], len(_SEVERITY_ORDER)), i)
+        for i, (v_text, v_info) in enumerate(violation_map.items())
+    }
+    if not rank:
+        return lambda para_text: None
+    
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for v_text in rank:
+            automaton.add_word(v_text, v_text)
+        automaton.make_automaton()
+        
+        def matched_violation(para_text):
+            return min((v_text for _, v_text in automaton.iter(para_text)), key=rank.__getitem__, default=None)
+        return matched_violation
+    
+    shingles, short_texts = build_violation_prefilter(rank)
+    pattern = re.compile('|'.join(re.escape(v_text) for v_text in sorted(rank, key=len, reverse=True)))
+    ranked_texts = sorted(rank, key=rank.__getitem__)
+    
+    def matched_violation(para_text):
+        # The regex only proves some violation is present; matches don't overlap, so the
+        # winner is found by checking the texts from the highest rank down
+        if not paragraph_may_contain_violation(para_text, shingles, short_texts) or not pattern.search(para_text):
+            return None
+        return next(v_text for v_text in ranked_texts if v_text in para_text)
+    return matched_violation
+
 # FIXED: PDF generation without HTML spans
+@st.cache_data(max_entries=32, show_spinner=False)
 def generate_highlighted_text_pdf(text, violations, filename):
     """Generate PDF with ACTUAL Bengali text highlighting - FINAL FIX"""
     if not PDF_AVAILABLE:
         return None
     
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import Color
+    
     try:
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
@@ -1906,18 +3413,36 @@ def generate_highlighted_text_pdf(text, violations, filename):
                     'type': violation.get('violationType', 'Unknown')
                 }
         
+        # A paragraph takes the severity of the most severe violation it contains
+        matched_violation = build_violation_matcher(violation_map)
+        
+        # Paragraph style per severity, built once instead of per violating paragraph
+        violation_para_styles = {
+            severity: ParagraphStyle(
+                'ViolationPara',
+                parent=styles['Normal'],
+                spaceBefore=6,
+                spaceAfter=6,
+                leftIndent=10,
+                rightIndent=10,
+                backColor=Color(*bg_rgb),
+                borderWidth=2,
+                borderColor=Color(*border_rgb),
+                borderPadding=5
+            )
+            for severity, (bg_rgb, border_rgb) in HIGHLIGHT_PDF_COLORS.items()
+        }
+        
         # Process text with ACTUAL text
         story.append(Paragraph("SCRIPT CONTENT WITH MARKED VIOLATIONS", styles['Heading1']))
         story.append(Spacer(1, 10))
         
-        # Split text into paragraphs
-        paragraphs = text.split('\n')
-        
-        for para_text in paragraphs:
+        # Walk the lines lazily instead of materializing the whole split list
+        for para_text in _iter_lines(text):
             if para_text.strip():
                 # Check for original page markers
                 if '=== ORIGINAL PAGE' in para_text:
-                    page_match = re.search(r'=== ORIGINAL PAGE (\d+) ===', para_text)
+                    page_match = _PAGE_MARKER_RE.search(para_text)
                     if page_match:
                         page_num = page_match.group(1)
                         page_style = ParagraphStyle(
@@ -1934,40 +3459,14 @@ def generate_highlighted_text_pdf(text, violations, filename):
                 # Check for violations in this paragraph
                 has_violation = False
                 violation_severity = None
-                for v_text, v_info in violation_map.items():
-                    if v_text in para_text:
-                        has_violation = True
-                        violation_severity = v_info['severity']
-                        break
+                matched_text = matched_violation(para_text)
+                if matched_text is not None:
+                    has_violation = True
+                    violation_severity = violation_map[matched_text]['severity']
                 
                 # Show ACTUAL text with violation marking
                 if has_violation:
-                    # Create violation paragraph style based on severity
-                    if violation_severity == 'critical':
-                        bg_color = Color(1, 0.9, 0.9)  # Light red
-                        border_color = Color(1, 0, 0)   # Red border
-                    elif violation_severity == 'high':
-                        bg_color = Color(1, 0.95, 0.8)  # Light orange
-                        border_color = Color(1, 0.5, 0) # Orange border
-                    elif violation_severity == 'medium':
-                        bg_color = Color(1, 1, 0.9)     # Light yellow
-                        border_color = Color(1, 1, 0)   # Yellow border
-                    else:
-                        bg_color = Color(0.95, 0.9, 1)  # Light purple
-                        border_color = Color(0.5, 0, 1) # Purple border
-                    
-                    violation_para_style = ParagraphStyle(
-                        'ViolationPara',
-                        parent=styles['Normal'],
-                        spaceBefore=6,
-                        spaceAfter=6,
-                        leftIndent=10,
-                        rightIndent=10,
-                        backColor=bg_color,
-                        borderWidth=2,
-                        borderColor=border_color,
-                        borderPadding=5
-                    )
+                    violation_para_style = violation_para_styles.get(violation_severity, violation_para_styles['low'])
                     
                     # FIXED: Show ACTUAL text, not placeholders
                     try:
@@ -2046,7 +3545,7 @@ def generate_highlighted_text_pdf(text, violations, filename):
             if para_text.strip():
                 # Check for original page markers
                 if '=== ORIGINAL PAGE' in para_text:
-                    page_match = re.search(r'=== ORIGINAL PAGE (\d+) ===', para_text)
+                    page_match = _PAGE_MARKER_RE.search(para_text)
                     if page_match:
                         page_num = page_match.group(1)
                         page_style = ParagraphStyle(
@@ -2084,7 +3583,7 @@ def generate_highlighted_text_pdf(text, violations, filename):
                     )
                     
                     # Check if text contains Bengali
-                    bengali_chars = sum(1 for char in para_text if '\u0980' <= char <= '\u09FF')
+                    bengali_chars = script_counts(para_text).bengali
                     if bengali_chars > 0:
                         # For Bengali text, show summary
                         display_text = f"[VIOLATION PARAGRAPH - Contains Bengali text: {len(para_text)} characters, {bengali_chars} Bengali characters]"
@@ -2101,7 +3600,7 @@ def generate_highlighted_text_pdf(text, violations, filename):
                         para_text = para_text[:800] + "..."
                     
                     # Check for Bengali
-                    bengali_chars = sum(1 for char in para_text if '\u0980' <= char <= '\u09FF')
+                    bengali_chars = script_counts(para_text).bengali
                     if bengali_chars > 0:
                         display_text = f"[Bengali paragraph: {len(para_text)} characters, {bengali_chars} Bengali characters]"
                         story.append(Paragraph(display_text, styles['Normal']))
@@ -2123,25 +3622,31 @@ def create_violation_charts(violations):
     if not violations:
         return None, None
     
-    df = pd.DataFrame(violations)
+    # The charts only depend on these counts, so reruns with the same counts skip building them;
+    # st.cache_data hands each call its own copy, so one session's figure changes stay its own
+    severity_counts = Counter(v['severity'] for v in violations if v.get('severity') is not None)
+    type_counts = Counter(v['violationType'] for v in violations if v.get('violationType') is not None)
+    return _cached_violation_charts(tuple(severity_counts.most_common()), tuple(type_counts.most_common(10)))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_violation_charts(severity_counts, type_counts):
+    """Severity pie and top-types bar from ((name, count), ...) tuples, most common first"""
+    import plotly.express as px
     
     # Severity distribution
-    severity_counts = df['severity'].value_counts()
-    severity_colors = {'critical': '#f44336', 'high': '#ff9800', 'medium': '#ffeb3b', 'low': '#9c27b0'}
-    
+    severity_names = [name for name, _ in severity_counts]
     fig_severity = px.pie(
-        values=severity_counts.values,
-        names=severity_counts.index,
+        values=[count for _, count in severity_counts],
+        names=severity_names,
         title="Violation Severity Distribution",
-        color=severity_counts.index,
-        color_discrete_map=severity_colors
+        color=severity_names,
+        color_discrete_map=dict(SEVERITY_CHART_COLORS)
     )
     
     # Violation types
-    type_counts = df['violationType'].value_counts().head(10)
     fig_types = px.bar(
-        x=type_counts.values,
-        y=type_counts.index,
+        x=[count for _, count in type_counts],
+        y=[name for name, _ in type_counts],
         orientation='h',
         title="Top Violation Types",
         labels={'x': 'Count', 'y': 'Violation Type'}
@@ -2232,7 +3737,7 @@ def create_mistral_ocr_tab():
                 st.success(f"✅ Extracted {len(extracted_text):,} characters")
                 
                 # Show extracted text with language detection
-                detected_language = detect_language(extracted_text)
+                detected_language = cached_detect_language(extracted_text)
                 
                 with st.expander("📄 Extracted Text Preview"):
                     st.write(f"**Detected Language:** {detected_language}")
@@ -2241,9 +3746,7 @@ def create_mistral_ocr_tab():
                     st.text_area("Extracted Text", extracted_text, height=300)
                 
                 # Show text statistics
-                unicode_chars = sum(1 for char in extracted_text if ord(char) > 127)
-                bengali_chars = sum(1 for char in extracted_text if '\u0980' <= char <= '\u09FF')
-                hindi_chars = sum(1 for char in extracted_text if '\u0900' <= char <= '\u097F')
+                unicode_chars, bengali_chars, hindi_chars = script_counts(extracted_text)
                 
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
@@ -2399,7 +3902,7 @@ def check_api_configuration():
         if openai_key:
             try:
                 # Test OpenAI API with minimal request
-                client = OpenAI(api_key=openai_key)
+                client = get_openai_client(openai_key)
                 response = client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[{"role": "user", "content": "Hi"}],
@@ -2427,7 +3930,7 @@ def check_api_configuration():
         if mistral_key:
             try:
                 headers = {"Authorization": f"Bearer {mistral_key}"}
-                response = requests.get("https://api.mistral.ai/v1/models", headers=headers, timeout=10)
+                response = get_mistral_session().get("https://api.mistral.ai/v1/models", headers=headers, timeout=10)
                 if response.status_code == 200:
                     st.success("✅ Mistral API: Working correctly")
                 elif response.status_code == 401:
@@ -2449,6 +3952,193 @@ def check_api_configuration():
 # Initialize Mistral OCR
 initialize_mistral_ocr()
 
+def extract_uploaded_document(uploaded_file, file_type, file_hash):
+    """Extract (text, pages_data) from an upload through the content-keyed extraction cache
+    
+    file_hash is the upload's _content_digest, already computed as its upload key.
+    A failed extraction (already reported by the extractor) returns (None, [])."""
+    # UploadedFile is a BytesIO over the received bytes, so getvalue() shares them rather than copying
+    file_bytes = uploaded_file.getvalue()
+    if file_type != 'pdf':
+        with st.spinner(f"📄 Extracting text from {file_type.upper()} document..."):
+            try:
+                return EXTRACTORS.get(file_type, _cached_extract_docx)(file_hash, file_bytes)
+            except ExtractionFailed:
+                return None, []
+    
+    # PDFs are read page by page, so show how far along the extraction is. Elements made
+    # outside a cached function can't be updated from inside it, so the extraction runs in
+    # a worker that reports pages on a queue and this thread draws the bar; a cache hit
+    # reports nothing and the bar is cleared without having been drawn
+    progress = st.empty()
+    pages_read = queue.Queue()
+    with ThreadPoolExecutor(max_workers=1, initializer=streamlit_worker_initializer()) as executor:
+        future = executor.submit(
+            _cached_extract_pdf, file_hash, file_bytes, lambda *page: pages_read.put(page)
+        )
+        while not wait([future], timeout=0.1).done or not pages_read.empty():
+            latest = None
+            while not pages_read.empty():
+                latest = pages_read.get_nowait()
+            if latest:
+                page_num, page_count = latest
+                progress.progress(page_num / page_count, text=f"📄 Extracting text from PDF document... page {page_num}/{page_count}")
+    progress.empty()
+    # The failure raised in the worker left nothing in the cache, so a retry extracts again
+    try:
+        return future.result()
+    except ExtractionFailed:
+        return None, []
+
+# Upload analyses are also saved to disk as gzipped JSON, per user and keyed by the upload's
+# content hash, so a re-upload after logout or a server restart needs no re-analysis.
+# Files expire CACHE_MAX_AGE_SECONDS after they are written, whatever their use since.
+# The cache is best effort: any I/O or decode error just means analyzing again
+def saved_analysis_path(upload_key):
+    user_dir = _content_digest(st.session_state.get('user_email') or 'anonymous')
+    return os.path.join(ANALYSIS_CACHE_DIR, user_dir, f"{upload_key}.json.gz")
+
+def load_saved_analysis(upload_key):
+    """Return a saved violations_data for this upload, or None"""
+    path = saved_analysis_path(upload_key)
+    try:
+        if os.path.getmtime(path) < time.time() - CACHE_MAX_AGE_SECONDS:
+            os.remove(path)
+            return None
+        with gzip.open(path, 'rb') as saved_file:
+            violations_data = json_loads(saved_file.read())
+    except (OSError, ValueError, EOFError):
+        return None
+    return violations_data
+
+def save_analysis(upload_key, violations_data):
+    """Write violations_data to the user's analysis cache, then delete expired and surplus files"""
+    path = saved_analysis_path(upload_key)
+    user_dir = os.path.dirname(path)
+    try:
+        for folder in (CACHE_DIR, ANALYSIS_CACHE_DIR, user_dir):
+            make_private_dir(folder)
+        # Write to a temp name and swap it in, so a reader never sees a half-written file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open_private_file(tmp_path) as raw_file, gzip.GzipFile(fileobj=raw_file, mode='wb', compresslevel=6) as saved_file:
+            saved_file.write(json_bytes(violations_data))
+        os.replace(tmp_path, path)
+        
+        # Expired files go for every user; the file-count cap applies to this user's folder
+        expired_before = time.time() - CACHE_MAX_AGE_SECONDS
+        for folder in os.scandir(ANALYSIS_CACHE_DIR):
+            if folder.is_dir():
+                for entry in os.scandir(folder.path):
+                    if entry.stat().st_mtime < expired_before:
+                        os.remove(entry.path)
+        saved = sorted(
+            (entry for entry in os.scandir(user_dir) if entry.name.endswith('.json.gz')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in saved[:-ANALYSIS_CACHE_FILES]:
+            os.remove(entry.path)
+    except (OSError, TypeError):
+        pass
+
+def forget_saved_analysis(upload_key):
+    try:
+        os.remove(saved_analysis_path(upload_key))
+    except OSError:
+        pass
+
+def remember_upload_analysis(upload_key, violations_data):
+    """Put an analysis in the session's LRU of uploads, evicting the oldest beyond DOC_CACHE_SIZE"""
+    doc_cache = st.session_state.doc_cache
+    doc_cache[upload_key] = violations_data
+    doc_cache.move_to_end(upload_key)
+    while len(doc_cache) > DOC_CACHE_SIZE:
+        doc_cache.popitem(last=False)
+
+def paste_cache_key(text):
+    """Whitespace-insensitive key for pasted text, so a re-indented or reflowed paste reuses its analysis"""
+    return _content_digest(' '.join(text.split()))
+
+def remember_paste_analysis(paste_key, paste_result):
+    """Put a paste analysis in the session's LRU, evicting the oldest beyond DOC_CACHE_SIZE"""
+    paste_cache = st.session_state.paste_cache
+    paste_cache[paste_key] = paste_result
+    paste_cache.move_to_end(paste_key)
+    while len(paste_cache) > DOC_CACHE_SIZE:
+        paste_cache.popitem(last=False)
+
+def store_upload_analysis(analysis, text, pages_data, filename, upload_key):
+    """Keep an upload's analysis in session state and show the results"""
+    st.session_state.violations_data = {
+        'violations': analysis.get('violations', []),
+        'summary': analysis.get('summary', {}),
+        'detected_language': analysis.get('detectedLanguage', 'Unknown'),
+        'text': text,
+        'pages_data': pages_data
+    }
+    st.session_state.current_filename = filename
+    st.session_state.analysis_complete = True
+    st.session_state.analyzed_key = upload_key
+    
+    # Re-uploading this file (or switching back to it) later skips the analysis. Empty
+    # results (no API key, failed calls) and keyword-scan fallbacks are not kept, so the
+    # next upload gets a real analysis
+    violations_data = st.session_state.violations_data
+    if violations_data['violations'] and not violations_data['summary'].get('keywordFallback'):
+        remember_upload_analysis(upload_key, violations_data)
+        save_analysis(upload_key, violations_data)
+    
+    # Display results
+    results_fragment(st.session_state.violations_data, filename)
+
+def render_pending_batch(uploaded_file, file_type, upload_key):
+    """Status of this upload's Batch API job; finishes the analysis once the job completes"""
+    pending = st.session_state.pending_batch
+    st.info(f"📦 **Batch analysis submitted** ({pending['chunks']} chunks, job `{pending['id']}`) - results can take up to 24 hours")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        check = st.button("🔄 Check Batch Status", type="primary", key="batch_check")
+    with col2:
+        if st.button("✖️ Forget Batch", key="batch_forget"):
+            st.session_state.pending_batch = None
+            st.rerun()
+    if not check:
+        return
+    
+    api_key = get_api_key()
+    try:
+        with st.spinner(f"⏳ Waiting up to {BATCH_WAIT_SECONDS}s for batch results..."):
+            batch = wait_for_batch(pending['id'], api_key)
+    except Exception as e:
+        st.error(f"❌ Could not check batch status: {e}")
+        return
+    
+    if batch.status != 'completed':
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            st.error(f"❌ Batch {batch.status} - please start the analysis again")
+            st.session_state.pending_batch = None
+        else:
+            counts = batch.request_counts
+            done = f" ({counts.completed}/{counts.total} chunks done)" if counts else ""
+            st.info(f"⏳ Batch status: **{batch.status}**{done} - check again later")
+        return
+    
+    text, pages_data = extract_uploaded_document(uploaded_file, file_type, upload_key)
+    if not text:
+        st.error("❌ Failed to extract text from document")
+        return
+    
+    try:
+        chunk_results = fetch_batch_results(batch, pending['chunks'], api_key)
+    except Exception as e:
+        st.error(f"❌ Could not download batch results: {e}")
+        return
+    
+    st.header("🤖 Processing Batch Results")
+    analysis = analyze_document(text, pages_data, chunk_results=chunk_results)
+    st.session_state.pending_batch = None
+    store_upload_analysis(analysis, text, pages_data, uploaded_file.name, upload_key)
+
 def main():
     # Authentication check
     if not authenticate_user():
@@ -2461,6 +4151,14 @@ def main():
         st.session_state.violations_data = None
     if 'current_filename' not in st.session_state:
         st.session_state.current_filename = None
+    if 'paste_results' not in st.session_state:
+        st.session_state.paste_results = None
+    if 'pending_batch' not in st.session_state:
+        st.session_state.pending_batch = None
+    if 'doc_cache' not in st.session_state:
+        st.session_state.doc_cache = OrderedDict()  # Upload content hash -> violations_data
+    if 'paste_cache' not in st.session_state:
+        st.session_state.paste_cache = OrderedDict()  # paste_cache_key -> (violations, detected_language)
     
     # Custom CSS for authenticated app
     st.markdown("""
@@ -2510,14 +4208,11 @@ def main():
     
     # Sidebar with user info and system status
     with st.sidebar:
-        st.markdown(f"""
-        <div class="user-info">
-            <h3>👤 User Information</h3>
-            <p><b>Name:</b> {st.session_state.get('user_name', 'Unknown')}</p>
-            <p><b>Email:</b> {st.session_state.get('user_email', 'unknown@hoichoi.tv')}</p>
-            <p><b>Role:</b> {'Admin' if st.session_state.get('is_admin', False) else 'Content Reviewer'}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(USER_INFO_HTML.format(
+            user_name=html.escape(str(st.session_state.get('user_name', 'Unknown'))),
+            user_email=html.escape(str(st.session_state.get('user_email', 'unknown@hoichoi.tv'))),
+            role='Admin' if st.session_state.get('is_admin', False) else 'Content Reviewer'
+        ), unsafe_allow_html=True)
         
         st.divider()
         
@@ -2555,7 +4250,7 @@ def main():
         
         # Check language detection
         try:
-            lang_detect = detect_language("আমি বাংলায় কথা বলি")
+            lang_detect = cached_detect_language("আমি বাংলায় কথা বলি")
             if lang_detect and lang_detect != "English":
                 st.success(f"✅ Language Detection: Working (Detected: {lang_detect})")
             else:
@@ -2612,13 +4307,22 @@ def main():
             st.session_state.analysis_complete = False
             st.session_state.violations_data = None
             st.session_state.current_filename = None
-            if 'reports_generated' in st.session_state:
-                del st.session_state.reports_generated
+            if st.session_state.paste_results:
+                st.session_state.paste_cache.pop(paste_cache_key(st.session_state.paste_results['text']), None)
+            st.session_state.paste_results = None
+            # Forget the current upload's results so it can be analyzed afresh
+            if st.session_state.get('analyzed_key'):
+                st.session_state.doc_cache.pop(st.session_state.analyzed_key, None)
+                forget_saved_analysis(st.session_state.analyzed_key)
+            st.session_state.analyzed_key = None
             st.rerun()
         
         if st.button("🚪 Logout", type="secondary"):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            discard_partial_results()
+            # One clear instead of a del per key; then reclaim the dropped analyses'
+            # reference cycles now rather than at the next collection
+            st.session_state.clear()
+            gc.collect()
             st.rerun()
     
     # API Key configuration section
@@ -2684,13 +4388,13 @@ def main():
     with col1:
         st.write("**Bengali Test:**")
         st.text(test_bengali)  # FIXED: Using st.text to preserve formatting
-        bengali_chars = sum(1 for char in test_bengali if '\u0980' <= char <= '\u09FF')
+        bengali_chars = script_counts(test_bengali).bengali
         st.caption(f"📊 {len(test_bengali)} chars, {bengali_chars} Bengali")
     
     with col2:
         st.write("**Hindi Test:**")
         st.text(test_hindi)  # FIXED: Using st.text to preserve formatting
-        hindi_chars = sum(1 for char in test_hindi if '\u0900' <= char <= '\u097F')
+        hindi_chars = script_counts(test_hindi).hindi
         st.caption(f"📊 {len(test_hindi)} chars, {hindi_chars} Hindi")
     
     if bengali_chars > 0 and hindi_chars > 0:
@@ -2703,16 +4407,11 @@ def main():
     
     with tab1:
         st.header("📤 Upload Document Analysis")
-        st.markdown("**Upload your screenplay/script for comprehensive aggressive S&P compliance review.**")
-        st.markdown("*🔍 Aggressive Detection: We analyze EVERYTHING - dialogues, scene descriptions, action lines, character names, props, settings, transitions*")
-        st.markdown("*⚠️ Better to over-detect than miss violations - we flag anything potentially problematic*")
-        st.markdown("*📋 Complete Coverage: All 24 S&P guidelines checked across entire script*")
-        st.markdown("*🌐 Enhanced Unicode Support: Proper Bengali/Hindi text handling*")
-        st.markdown("*📊 XLSX Export: Full Unicode support in Excel reports*")
+        st.markdown(UPLOAD_TAB_INTRO_MD)
         
         # Show current analysis if available
         if st.session_state.analysis_complete and st.session_state.violations_data:
-            display_analysis_results(st.session_state.violations_data, st.session_state.current_filename)
+            results_fragment(st.session_state.violations_data, st.session_state.current_filename)
         else:
             uploaded_file = st.file_uploader(
                 "Choose a document file",
@@ -2720,194 +4419,483 @@ def main():
                 help="Upload a Microsoft Word document (.docx) or PDF file for S&P compliance analysis"
             )
             
+            # Offer violations saved by an analysis that was interrupted mid-run
+            partial_results = st.session_state.get('partial_results')
+            partial_path = partial_results.path if partial_results is not None else None
+            if partial_path and os.path.exists(partial_path):
+                recovered = list(read_ndjson(partial_path))
+                if recovered:
+                    st.warning(f"⚠️ Recovered {len(recovered)} violations from an interrupted analysis")
+                    with open(partial_path, 'rb') as partial_file:
+                        st.download_button(
+                            label="📥 Download Partial Results (NDJSON)",
+                            data=partial_file,
+                            file_name="partial_violations.ndjson",
+                            mime="application/x-ndjson",
+                            key="partial_download"
+                        )
+            
             if uploaded_file is not None:
                 file_type = uploaded_file.name.split('.')[-1].lower()
                 st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size/1024:.1f} KB)")
                 
-                if st.button("🔍 Start Analysis", type="primary", key="upload_analyze"):
-                    # Extract text based on file type
-                    with st.spinner(f"📄 Extracting text from {file_type.upper()} document..."):
-                        if file_type == 'pdf':
-                            text, pages_data = extract_text_from_pdf_bytes(uploaded_file.getvalue())
-                        else:  # docx
-                            text, pages_data = extract_text_from_docx_bytes(uploaded_file.getvalue())
-                    
-                    if not text:
-                        st.error("❌ Failed to extract text from document")
-                        return
-                    
-                    st.success(f"✅ Extracted {len(text):,} characters from {len(pages_data)} pages")
-                    
-                    # Analyze document
-                    st.header("🤖 Analysis in Progress")
-                    analysis = analyze_document(text, pages_data)
-                    
-                    # Store results in session state
-                    st.session_state.violations_data = {
-                        'violations': analysis.get('violations', []),
-                        'summary': analysis.get('summary', {}),
-                        'detected_language': analysis.get('detectedLanguage', 'Unknown'),
-                        'text': text,
-                        'pages_data': pages_data
-                    }
+                # Keyed by content, so a renamed copy of an analyzed file is recognized too
+                upload_key = _content_digest(uploaded_file.getvalue())
+                
+                saved_analysis = st.session_state.doc_cache.get(upload_key)
+                if saved_analysis is None:
+                    saved_analysis = load_saved_analysis(upload_key)
+                
+                if saved_analysis is not None:
+                    # This upload was already analyzed - reuse the stored results, no re-extraction or API calls
+                    remember_upload_analysis(upload_key, saved_analysis)
+                    st.session_state.violations_data = saved_analysis
                     st.session_state.current_filename = uploaded_file.name
                     st.session_state.analysis_complete = True
-                    
-                    # Display results
-                    display_analysis_results(st.session_state.violations_data, uploaded_file.name)
+                    st.session_state.analyzed_key = upload_key
+                    results_fragment(st.session_state.violations_data, uploaded_file.name)
+                elif (st.session_state.pending_batch or {}).get('upload_key') == upload_key:
+                    # A Batch API job for this upload is in flight
+                    render_pending_batch(uploaded_file, file_type, upload_key)
+                else:
+                    analysis_mode = st.radio(
+                        "Analysis mode",
+                        ["Interactive", "Batch (50% cheaper, up to 24h)"],
+                        horizontal=True,
+                        key="analysis_mode",
+                        help="Batch mode submits every chunk to the OpenAI Batch API; check back for the results"
+                    )
+                    if st.button("🔍 Start Analysis", type="primary", key="upload_analyze"):
+                        # Extract text based on file type
+                        text, pages_data = extract_uploaded_document(uploaded_file, file_type, upload_key)
+                        
+                        if not text:
+                            st.error("❌ Failed to extract text from document")
+                            return
+                        
+                        st.success(f"✅ Extracted {len(text):,} characters from {len(pages_data)} pages")
+                        
+                        if analysis_mode == "Interactive":
+                            # Analyze document
+                            st.header("🤖 Analysis in Progress")
+                            analysis = analyze_document(text, pages_data)
+                            store_upload_analysis(analysis, text, pages_data, uploaded_file.name, upload_key)
+                        elif not (OPENAI_AVAILABLE and get_api_key()):
+                            st.error("❌ Batch mode needs an OpenAI API key")
+                        else:
+                            chunks = chunk_text(text)
+                            try:
+                                with st.spinner(f"📦 Submitting {len(chunks)} chunks to the OpenAI Batch API..."):
+                                    batch_id = submit_analysis_batch(chunks, get_api_key())
+                            except Exception as e:
+                                st.error(f"❌ Batch submission failed: {e}")
+                            else:
+                                st.session_state.pending_batch = {
+                                    'id': batch_id,
+                                    'upload_key': upload_key,
+                                    'chunks': len(chunks)
+                                }
+                                st.rerun()
     
     with tab2:
-        st.header("📝 Paste Text Analysis")
-        st.markdown("**Paste your screenplay content for comprehensive aggressive S&P compliance review.**")
-        st.markdown("*🔍 Aggressive Detection: We examine every line for potential violations*")
-        st.markdown("*⚠️ Thorough Analysis: Dialogues, scene descriptions, actions, character behavior, props, settings*")
-        st.markdown("*🌐 Enhanced Unicode Support: Perfect Bengali/Hindi text handling*")
-        
-        text_input = st.text_area(
-            "Paste your screenplay/script content here",
-            height=300,
-            placeholder="Paste your screenplay content here for aggressive S&P compliance analysis...\n\nINT. LIVING ROOM - DAY\n\nRAJ sits on the sofa.\n\nRAJ\n(dialogue here)\nHello, how are you?\n\nPRIYA enters the room.\n\nPRIYA\nI'm fine, thanks.\n\nOr paste Bengali text:\nআমি বাংলায় কথা বলি। এটি একটি পরীক্ষা।\n\nOur AI will analyze every element for potential violations!"
-        )
-        
-        if text_input and st.button("🔍 Analyze Text", type="primary", key="paste_analyze"):
-            # Create mock pages data for pasted text
-            pages_data = [{"page_number": 1, "text": text_input, "original_page": 1}]
-            
-            # Analyze pasted text
-            st.header("🤖 Analyzing Pasted Text")
-            analysis = analyze_document(text_input, pages_data)
-            
-            violations = analysis.get('violations', [])
-            detected_language = analysis.get('detectedLanguage', 'Unknown')
-            
-            # Display results for pasted text
-            display_paste_analysis_results(violations, detected_language, text_input)
+        paste_tab_fragment()
     
     with tab3:
         create_mistral_ocr_tab()
     
     # Footer with violation rules
-    with st.expander("📋 S&P Violation Guidelines Reference (24 Aggressive Detection Rules)"):
-        st.markdown("### 🎯 hoichoi Standards & Practices Guidelines")
-        st.markdown("**Our system uses AGGRESSIVE DETECTION to find violations across your entire screenplay. We analyze every element thoroughly.**")
-        st.markdown("---")
-        
-        st.markdown("### 🔍 **What We Analyze:**")
-        st.markdown("""
-        - **📝 Dialogues**: Every line of character speech
-        - **🎬 Scene Descriptions**: Location setups, visual descriptions
-        - **🎭 Action Lines**: Character movements, behaviors, actions
-        - **👥 Character Names**: All character references and mentions
-        - **🎪 Props & Settings**: Objects, locations, visual elements
-        - **🎞️ Transitions**: Scene changes, cuts, fades, directions
-        """)
-        
-        st.markdown("### ⚠️ **24 Violation Categories We Detect:**")
-        
-        for i, (rule_name, rule_data) in enumerate(VIOLATION_RULES.items(), 1):
-            severity = rule_data['severity']
-            if severity == "critical":
-                st.error(f"🔴 **{i}. {rule_name.replace('_', ' ')}**")
-            elif severity == "high":
-                st.warning(f"🟠 **{i}. {rule_name.replace('_', ' ')}**")
-            else:
-                st.info(f"🟡 **{i}. {rule_name.replace('_', ' ')}**")
-            
-            st.markdown(f"**Description:** {rule_data['description']}")
-            st.markdown(f"**Context:** {rule_data['context']}")
-            st.markdown(f"**Keywords:** {', '.join(rule_data['keywords'])}")
-            st.markdown("---")
-        
-        st.markdown("### 🎯 **Detection Philosophy**")
-        st.markdown("""
-        **✅ Better to Over-Detect than Miss Violations**
-        - We flag anything that could potentially be problematic
-        - When in doubt, we flag it for your review
-        - Comprehensive analysis of all screenplay elements
-        
-        **🔍 Multi-Method Detection**
-        - Keyword scanning for quick identification
-        - Context analysis for subtle violations
-        - Cultural sensitivity checks
-        - Intent and meaning analysis
-        
-        **📋 Complete Coverage**
-        - No element of your screenplay is ignored
-        - Every dialogue line is examined
-        - Every scene description is analyzed
-        - Every action and prop is checked
-        """)
-        
-        st.markdown("**📝 Result:** Comprehensive violation detection across your entire screenplay with detailed solutions for each issue found.")
+    render_guidelines_reference()
     
     # Footer
     st.markdown("---")
-    st.markdown(f"""
-    <div style='text-align: center; color: #666; font-size: 0.9em;'>
-        <p>🎬 hoichoi S&P Compliance System v3.0 - FIXED VERSION | Enhanced Unicode Support | Mistral OCR Integration | XLSX Export | Reviewed by: {st.session_state.get('user_name', 'Unknown')}</p>
-        <p>🔒 Secure access • 🔍 Aggressive violation detection • 🌐 Bengali/Hindi/Multi-language support • 📊 Full Unicode Excel reports • 🔍 Cloud OCR</p>
-        <p style="color: green;">✅ FIXES: PDF generation • Bengali text preservation • API error handling • Excel Unicode support</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML.format(user_name=html.escape(str(st.session_state.get('user_name', 'Unknown')))), unsafe_allow_html=True)
+
+# FIXED: Enhanced Display Functions - violations are rendered as one HTML batch
+def html_text(value):
+    """Escape text for the violation cards, keeping line breaks on a single HTML line"""
+    return html.escape(str(value)).replace('\r\n', '\n').replace('\n', '<br>')
+
+# Card templates compiled once at import; every substituted value is escaped by the caller
+_VIOLATION_CARD_TPL = Template(
+    '<div class="violation severity-$severity" style="margin-bottom: 1rem;">'
+    '<div style="background: $background; border-left: 4px solid $border; padding: 0.6rem 1rem; border-radius: 4px;">'
+    '$emoji $title</div>'
+    '<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; padding-top: 0.5rem;">'
+    '<div style="min-width: 0;">$left</div>'
+    '<div style="min-width: 0;">$right</div>'
+    '</div><hr style="margin: 0.8rem 0 0 0;"></div>'
+)
+_EXACT_TEXT_TPL = Template('<div style="font-family: monospace; white-space: pre-wrap; margin-bottom: 0.4rem;">$text</div>')
+_CONTEXT_TPL = Template('<b>📄 Context:</b><br>...$before<b>$match</b>$after...<br>')
+# Card sections for the two result views; every field is already escaped by ViolationView/html_text
+_DETAILS_TITLE_TPL = Template('<b>$type</b> (Page $page)')
+_DETAILS_LEFT_TPL = Template('<b>🚨 Exact Violated Text:</b>$text$text_stats<b>Issue:</b> $explanation')
+_DETAILS_RIGHT_TPL = Template(
+    '<b>🤖 AI Solution ($language):</b>$solution$solution_stats<b>Recommended Action:</b> $action'
+)
+_PASTE_TITLE_TPL = Template('<b>Violation #$index: $type</b>')
+_PASTE_RIGHT_TPL = Template(
+    '<b>🤖 AI Solution ($language):</b>$solution<b>Suggested action:</b> $action<br><b>Severity:</b> $severity'
+)
+
+def violation_card_html(title_html, severity, left_html, right_html):
+    """Build the HTML card shared by the upload and paste result views"""
+    return _VIOLATION_CARD_TPL.substitute(
+        severity=html.escape(str(severity)),
+        background=SEVERITY_BG.get(severity, SEVERITY_BG['low']),
+        border=SEVERITY_BORDER.get(severity, SEVERITY_BORDER['low']),
+        emoji=SEVERITY_ICON.get(severity, SEVERITY_ICON['low']),
+        title=title_html,
+        left=left_html,
+        right=right_html
+    )
+
+def exact_text_html(text):
+    """Monospace block that preserves Bengali/Hindi text exactly (replaces st.text)"""
+    return _EXACT_TEXT_TPL.substitute(text=html_text(text))
 
-# FIXED: Enhanced Display Functions - Replace display_violation_details
-def display_violation_details(violation, index, detected_language):
-    """Display individual violation details with exact Bengali text preservation - FIXED"""
+class ViolationView(NamedTuple):
+    """Display-ready fields for one violation, normalized and escaped once per analysis"""
+    severity: str
+    severity_label: str
+    type_html: str
+    page_html: str
+    text: str
+    text_html: str
+    text_stats_html: str
+    solution_html: str
+    solution_stats_html: str
+    explanation_html: str
+    action_html: str
+    solution: str
+
+def make_violation_view(violation):
+    """Normalize a violation dict into a ViolationView"""
     severity = violation.get('severity', 'low')
+    violation_text = violation.get("violationText", "N/A")
+    ai_solution = violation.get("aiSolution", "No solution available")
     
-    if severity == 'critical':
-        st.error(f"🔴 **{violation.get('violationType', 'Unknown')}** (Page {violation.get('pageNumber', 'N/A')})")
-    elif severity == 'high':
-        st.warning(f"🟠 **{violation.get('violationType', 'Unknown')}** (Page {violation.get('pageNumber', 'N/A')})")
-    elif severity == 'medium':
-        st.info(f"🟡 **{violation.get('violationType', 'Unknown')}** (Page {violation.get('pageNumber', 'N/A')})")
-    else:
-        st.success(f"🟢 **{violation.get('violationType', 'Unknown')}** (Page {violation.get('pageNumber', 'N/A')})")
+    # Character analysis
+    text_stats_html = ''
+    unicode_count, bengali_count, hindi_count = script_counts(violation_text)
+    if unicode_count > 0:
+        text_stats_html = f'<small style="color: #666;">📊 {len(violation_text)} chars total | {unicode_count} Unicode | {bengali_count} Bengali | {hindi_count} Hindi</small><br>'
+    solution_stats_html = ''
+    solution_unicode, solution_bengali, _ = script_counts(ai_solution)
+    if solution_unicode > 0:
+        solution_stats_html = f'<small style="color: #666;">📊 {len(ai_solution)} chars total | {solution_unicode} Unicode | {solution_bengali} Bengali</small><br>'
     
-    col_a, col_b = st.columns([1, 1])
+    return ViolationView(
+        severity=severity,
+        severity_label=SEVERITY_LABEL.get(severity) or html_text(str(severity).upper()),
+        type_html=html_text(violation.get('violationType', 'Unknown')),
+        page_html=html_text(violation.get('pageNumber', 'N/A')),
+        text=violation.get('violationText', ''),
+        text_html=exact_text_html(violation_text),
+        text_stats_html=text_stats_html,
+        solution_html=exact_text_html(ai_solution),
+        solution_stats_html=solution_stats_html,
+        explanation_html=html_text(violation.get('explanation', 'N/A')),
+        action_html=html_text(violation.get('suggestedAction', 'N/A')),
+        solution=ai_solution
+    )
+
+def get_violation_views(violations, view_key):
+    """ViolationViews for a violation list, kept in session state so reruns skip re-normalizing
     
-    with col_a:
-        st.write("**🚨 Exact Violated Text:**")
-        violation_text = violation.get("violationText", "N/A")
-        
-        # FIXED: Show exact Bengali text using st.text (preserves formatting)
-        st.text(violation_text)
-        
-        # Also show in expandable code block for copying
-        with st.expander("📋 Copy Exact Text"):
-            st.code(violation_text, language=None)
-        
-        # Show character analysis
-        unicode_count = sum(1 for char in violation_text if ord(char) > 127)
-        bengali_count = sum(1 for char in violation_text if '\u0980' <= char <= '\u09FF')
-        hindi_count = sum(1 for char in violation_text if '\u0900' <= char <= '\u097F')
-        
-        if unicode_count > 0:
-            st.caption(f"📊 {len(violation_text)} chars total | {unicode_count} Unicode | {bengali_count} Bengali | {hindi_count} Hindi")
-        
-        st.write(f"**Issue:** {violation.get('explanation', 'N/A')}")
+    One entry per view_key, so the upload and paste results shown side by side don't
+    evict each other."""
+    cache = st.session_state.setdefault('violation_views', {})
+    cached = cache.get(view_key)
+    if cached and cached[0] is violations:
+        return cached[1]
+    views = [make_violation_view(v) for v in violations]
+    cache[view_key] = (violations, views)
+    return views
+
+def violation_details_html(view, index, detected_language):
+    """Build the HTML card for one violation with exact Bengali text preservation - FIXED"""
+    title = _DETAILS_TITLE_TPL.substitute(type=view.type_html, page=view.page_html)
+    left = _DETAILS_LEFT_TPL.substitute(
+        text=view.text_html, text_stats=view.text_stats_html, explanation=view.explanation_html
+    )
+    right = _DETAILS_RIGHT_TPL.substitute(
+        language=html_text(detected_language), solution=view.solution_html,
+        solution_stats=view.solution_stats_html, action=view.action_html
+    )
+    return violation_card_html(title, view.severity, left, right)
+
+def locate_violation_texts(text_input, violated_texts):
+    """Find the first position of every violated text with one pass over the input
     
-    with col_b:
-        st.write(f"**🤖 AI Solution ({detected_language}):**")
-        ai_solution = violation.get("aiSolution", "N/A")
-        
-        # FIXED: Show exact Bengali solution
-        st.text(ai_solution)
-        
-        # Also show in expandable code block for copying
-        with st.expander("📋 Copy Solution"):
-            st.code(ai_solution, language=None)
-        
-        # Show solution character analysis
-        solution_unicode = sum(1 for char in ai_solution if ord(char) > 127)
-        solution_bengali = sum(1 for char in ai_solution if '\u0980' <= char <= '\u09FF')
+    Uses an Aho-Corasick automaton when available, else a compiled-regex pass."""
+    needles = sorted({t for t in violated_texts if t}, key=len, reverse=True)
+    positions = {}
+    if not needles:
+        return positions
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        # Matches arrive by end offset, which for one needle is also start order, and
+        # overlapping or nested occurrences are all reported - so this equals str.find
+        for end, needle in automaton.iter(text_input):
+            positions.setdefault(needle, end - len(needle) + 1)
+            if len(positions) == len(needles):
+                break
+        for needle in needles:
+            positions.setdefault(needle, -1)
+        return positions
+    # Longest-first alternation so a longer violation wins over a shorter one sharing its start
+    pattern = re.compile("|".join(map(re.escape, needles)))
+    for match in pattern.finditer(text_input):
+        positions.setdefault(match.group(), match.start())
+        if len(positions) == len(needles):
+            break
+    # Texts fully nested inside another match are not reported by finditer; look them up directly
+    for needle in needles:
+        if needle not in positions:
+            positions[needle] = text_input.find(needle)
+    return positions
+
+def paste_violation_html(view, index, detected_language, text_input, positions):
+    """Build the HTML card for one pasted-text violation with its surrounding context - ENHANCED"""
+    violated_text = view.text
+    title = _PASTE_TITLE_TPL.substitute(index=index, type=view.type_html)
+    
+    left = ['<b>🚨 Exact Violated Text:</b>', view.text_html]
+    # Show context around the violation (optional)
+    if violated_text and len(text_input) > len(violated_text):
+        pos = positions.get(violated_text, -1)
+        if pos != -1:
+            # Show 50 characters before and after for context, violated text in bold
+            start = max(0, pos - 50)
+            end = min(len(text_input), pos + len(violated_text) + 50)
+            left.append(_CONTEXT_TPL.substitute(
+                before=html_text(text_input[start:pos]),
+                match=html_text(violated_text),
+                after=html_text(text_input[pos + len(violated_text):end])
+            ))
+    left.append(f"<b>Why this violates S&amp;P:</b> {view.explanation_html}")
+    
+    right = _PASTE_RIGHT_TPL.substitute(
+        language=html_text(detected_language), solution=view.solution_html,
+        action=view.action_html, severity=view.severity_label
+    )
+    
+    return violation_card_html(title, view.severity, ''.join(left), right)
+
+def render_violations_table(violations):
+    """All violations as one virtualized st.dataframe instead of a card per violation"""
+    df = pd.DataFrame({
+        'Severity': [v.get('severity', 'low').upper() for v in violations],
+        'Type': [v.get('violationType', 'Unknown') for v in violations],
+        'Page': [str(v.get('pageNumber', 'N/A')) for v in violations],
+        'Violated Text': [v.get('violationText', 'N/A') for v in violations],
+        'AI Solution': [v.get('aiSolution', 'N/A') for v in violations]
+    })
+    st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Severity': st.column_config.TextColumn(width="small"),
+            'Page': st.column_config.TextColumn(width="small"),
+            'Violated Text': st.column_config.TextColumn(width="large"),
+            'AI Solution': st.column_config.TextColumn(width="large")
+        }
+    )
+
+def paginated_violation_views(violations, key):
+    """(offset, views) for the page of detailed cards picked with a page selector
+    
+    Cards are paginated so long scripts don't render hundreds at once."""
+    total_pages = max(1, -(-len(violations) // VIOLATIONS_PER_PAGE))
+    page = 1
+    if total_pages > 1:
+        page = int(st.number_input(
+            f"Page (of {total_pages})",
+            min_value=1,
+            max_value=total_pages,
+            value=1,
+            step=1,
+            key=key
+        ))
+    start = (page - 1) * VIOLATIONS_PER_PAGE
+    return start, get_violation_views(violations, key)[start:start + VIOLATIONS_PER_PAGE]
+
+def render_violations(violation_cards, views=None):
+    """Emit all violation cards with a single st.html call - pure HTML, so no Markdown pass
+    
+    With views, each card is followed by st.code blocks of its exact text and solution
+    instead, for one-click copying (st.html strips the scripts a copy button would need)."""
+    if not violation_cards:
+        return
+    if views is None:
+        st.html("".join(violation_cards))
+        return
+    for card, view in zip(violation_cards, views):
+        st.html(card)
+        with st.expander("📋 Copy Exact Text & Solution"):
+            st.code(view.text, language=None)
+            st.code(view.solution, language=None)
+
+@st.fragment
+def render_guidelines_reference():
+    """Static guideline reference, isolated in a fragment so it is not re-emitted by widget reruns"""
+    with st.expander("📋 S&P Violation Guidelines Reference (24 Aggressive Detection Rules)"):
+        st.markdown(GUIDELINES_INTRO_MD)
         
-        if solution_unicode > 0:
-            st.caption(f"📊 {len(ai_solution)} chars total | {solution_unicode} Unicode | {solution_bengali} Bengali")
+        st.html(GUIDELINES_HTML)
         
-        st.write(f"**Recommended Action:** {violation.get('suggestedAction', 'N/A')}")
+        st.markdown(GUIDELINES_OUTRO_MD)
+
+def report_digest(violations, filename):
+    """Stable key for one analysis' reports"""
+    return _content_digest(json_bytes([filename, violations], sort_keys=True))
+
+# Reports are generated off the script thread on one process-wide pool, so the results
+# render immediately and each download button appears as soon as its report is ready
+@st.cache_resource(show_spinner=False)
+def get_report_executor():
+    """The process-wide thread pool that generates reports"""
+    return ThreadPoolExecutor(max_workers=3, thread_name_prefix="reports")
+
+@st.cache_resource(show_spinner=False)
+def get_reports_dir():
+    """Create the private reports directory once per process, sweeping files a crashed server left"""
+    make_private_dir(CACHE_DIR)
+    make_private_dir(REPORTS_DIR)
+    remove_orphan_files(REPORTS_DIR)
+    return REPORTS_DIR
+
+class ReportFile:
+    """A generated report spilled to a 0o600 file in the private reports directory
+    
+    The file is deleted when the object is garbage collected, i.e. once the
+    prepare_reports entry holding it has been evicted."""
+    def __init__(self, data, suffix):
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=get_reports_dir())
+        with os.fdopen(fd, 'wb') as report_file:
+            report_file.write(data)
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def prepare_reports(report_key, _violations, _text, filename):
+    """Start the three reports once per analysis; returns {kind: Future of ReportFile or None}
+    
+    Reports are spilled to disk so download buttons stream them from a file, and reruns
+    reuse the same futures and files."""
+    attach_context = streamlit_worker_initializer()
+    executor = get_report_executor()
+    
+    def run(suffix, generate, *args):
+        attach_context()
+        data = generate(*args)
+        return ReportFile(data, suffix) if data else None
+    
+    # The three generators are independent, so run them side by side
+    return {
+        'excel': executor.submit(run, '.xlsx', generate_excel_report, _violations, filename),
+        'violations_pdf': executor.submit(run, '.pdf', generate_violations_report_pdf, _violations, filename),
+        'highlighted_pdf': executor.submit(run, '.pdf', generate_highlighted_text_pdf, _text, _violations, filename)
+    }
+
+# (kind, button label, file name suffix, mime type, widget key, note shown under the button)
+REPORT_DOWNLOADS = (
+    ('excel', "📊 Excel Report (XLSX)", "_violations_detected.xlsx",
+     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "excel_download",
+     (st.success, "✅ Full Unicode support in Excel")),
+    ('violations_pdf', "📋 Violations Report (PDF)", "_violations_report.pdf",
+     "application/pdf", "violations_download",
+     (st.info, "ℹ️ Bengali text shown as placeholders in PDF")),
+    ('highlighted_pdf', "🎨 Highlighted Script (PDF)", "_highlighted_violations.pdf",
+     "application/pdf", "highlighted_download",
+     (st.info, "ℹ️ Bengali text shown as placeholders in PDF"))
+)
+
+def render_report_downloads(reports, filename, polling=False):
+    """Download buttons in columns - a report still being generated shows a placeholder
+    
+    When polling (run as a run_every fragment), a full rerun once every report is
+    done swaps the fragment for a static render so the polling stops."""
+    if polling and all(future.done() for future in reports.values()):
+        st.rerun()
     
-    st.divider()
+    for col, (kind, label, suffix, mime, key, (note_fn, note)) in zip(st.columns(3), REPORT_DOWNLOADS):
+        with col:
+            future = reports[kind]
+            if not future.done():
+                st.caption(f"⏳ Generating {label}...")
+                continue
+            report = future.result()
+            if report:
+                try:
+                    report_file = open(report.path, 'rb')
+                except OSError:
+                    continue  # Swept from disk by another server process
+                with report_file:
+                    st.download_button(
+                        label=label,
+                        data=report_file,
+                        file_name=f"{filename}{suffix}",
+                        mime=mime,
+                        key=key
+                    )
+                note_fn(note)
+
+@st.fragment
+def paste_tab_fragment():
+    """Paste tab as a fragment - typing, analyzing and paging rerun only this tab, not main()"""
+    st.header("📝 Paste Text Analysis")
+    st.markdown(PASTE_TAB_INTRO_MD)
+    
+    text_input = st.text_area(
+        "Paste your screenplay/script content here",
+        height=300,
+        placeholder="Paste your screenplay content here for aggressive S&P compliance analysis...\n\nINT. LIVING ROOM - DAY\n\nRAJ sits on the sofa.\n\nRAJ\n(dialogue here)\nHello, how are you?\n\nPRIYA enters the room.\n\nPRIYA\nI'm fine, thanks.\n\nOr paste Bengali text:\nআমি বাংলায় কথা বলি। এটি একটি পরীক্ষা।\n\nOur AI will analyze every element for potential violations!"
+    )
+    
+    if text_input and st.button("🔍 Analyze Text", type="primary", key="paste_analyze"):
+        # Text already analyzed this session (ignoring whitespace) needs no API calls;
+        # the violations are located in the new text again when displayed
+        paste_key = paste_cache_key(text_input)
+        cached_paste = st.session_state.paste_cache.get(paste_key)
+        if cached_paste:
+            violations, detected_language = cached_paste
+            st.session_state.paste_cache.move_to_end(paste_key)
+            st.success("⚡ This text was already analyzed - showing the saved results")
+        else:
+            # Create mock pages data for pasted text
+            pages_data = [{"page_number": 1, "text": text_input, "original_page": 1}]
+            
+            # Analyze pasted text
+            st.header("🤖 Analyzing Pasted Text")
+            analysis = analyze_document(text_input, pages_data)
+            
+            violations = analysis.get('violations', [])
+            detected_language = analysis.get('detectedLanguage', 'Unknown')
+            if violations and not analysis.get('summary', {}).get('keywordFallback'):
+                remember_paste_analysis(paste_key, (violations, detected_language))
+        
+        # Keep the results so page changes don't drop them on rerun
+        st.session_state.pop('paste_violations_page', None)
+        st.session_state.paste_results = {
+            'violations': violations,
+            'detected_language': detected_language,
+            'text': text_input
+        }
+    
+    # Display results for pasted text
+    paste_results = st.session_state.paste_results
+    if paste_results and text_input and paste_results['text'] == text_input:
+        display_paste_analysis_results(paste_results['violations'], paste_results['detected_language'], text_input)
+
+@st.fragment
+def results_fragment(violations_data, filename):
+    """Results panel as a fragment - download clicks rerun only this panel, not main()"""
+    display_analysis_results(violations_data, filename)
 
 def display_analysis_results(violations_data, filename):
     """Display analysis results with aggressive detection feedback - ENHANCED"""
@@ -2927,8 +4915,8 @@ def display_analysis_results(violations_data, filename):
     with col1:
         st.metric("Total Violations Found", summary.get('totalViolations', 0))
     with col2:
-        critical_count = len([v for v in violations if v.get('severity') == 'critical'])
-        st.metric("🔴 Critical Issues", critical_count)
+        severity_counts = Counter(v.get('severity') for v in violations)
+        st.metric("🔴 Critical Issues", severity_counts['critical'])
     with col3:
         st.metric("📄 Pages Analyzed", summary.get('totalPages', 0))
     with col4:
@@ -2959,65 +4947,24 @@ def display_analysis_results(violations_data, filename):
         st.subheader(f"🚨 Detected Violations with AI Solutions ({detected_language})")
         st.markdown("*Each violation detected through comprehensive script analysis*")
         
-        for i, violation in enumerate(violations[:15]):  # Show first 15
-            display_violation_details(violation, i+1, detected_language)
+        if len(violations) > VIOLATIONS_PER_PAGE:
+            render_violations_table(violations)
         
-        if len(violations) > 15:
-            st.info(f"Showing first 15 of {len(violations)} total violations detected")
+        start, page_views = paginated_violation_views(violations, "upload_violations_page")
+        render_violations([
+            violation_details_html(view, i, detected_language)
+            for i, view in enumerate(page_views, start + 1)
+        ], page_views)
         
         # Download Reports Section
         st.subheader("📥 Download Comprehensive Reports")
         
-        # Generate reports (cached to avoid regeneration)
-        if 'reports_generated' not in st.session_state:
-            with st.spinner("Generating comprehensive reports..."):
-                excel_data = generate_excel_report(violations, filename)
-                violations_pdf = generate_violations_report_pdf(violations, filename)
-                highlighted_pdf = generate_highlighted_text_pdf(text, violations, filename)
-                
-                st.session_state.reports_generated = {
-                    'excel': excel_data,
-                    'violations_pdf': violations_pdf,
-                    'highlighted_pdf': highlighted_pdf
-                }
-        
-        reports = st.session_state.reports_generated
-        
-        # Download buttons in columns
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if reports['excel']:
-                st.download_button(
-                    label="📊 Excel Report (XLSX)",
-                    data=reports['excel'],
-                    file_name=f"{filename}_violations_detected.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="excel_download"
-                )
-                st.success("✅ Full Unicode support in Excel")
-        
-        with col2:
-            if reports['violations_pdf']:
-                st.download_button(
-                    label="📋 Violations Report (PDF)",
-                    data=reports['violations_pdf'],
-                    file_name=f"{filename}_violations_report.pdf",
-                    mime="application/pdf",
-                    key="violations_download"
-                )
-                st.info("ℹ️ Bengali text shown as placeholders in PDF")
-        
-        with col3:
-            if reports['highlighted_pdf']:
-                st.download_button(
-                    label="🎨 Highlighted Script (PDF)",
-                    data=reports['highlighted_pdf'],
-                    file_name=f"{filename}_highlighted_violations.pdf",
-                    mime="application/pdf",
-                    key="highlighted_download"
-                )
-                st.info("ℹ️ Bengali text shown as placeholders in PDF")
+        # Reports are generated in the background and spilled to disk once per analysis
+        reports = prepare_reports(report_digest(violations, filename), violations, text, filename)
+        if all(future.done() for future in reports.values()):
+            render_report_downloads(reports, filename)
+        else:
+            st.fragment(render_report_downloads, run_every=1)(reports, filename, polling=True)
         
         st.info(f"📋 **Reports Generated:** Excel with {len(violations)} violations (full Unicode support), PDF violation summary, and highlighted script with flagged content")
     
@@ -3032,8 +4979,7 @@ def display_paste_analysis_results(violations, detected_language, text_input):
     
     # Show text statistics
     total_chars = len(text_input)
-    unicode_chars = sum(1 for char in text_input if ord(char) > 127)
-    bengali_chars = sum(1 for char in text_input if '\u0980' <= char <= '\u09FF')
+    unicode_chars, bengali_chars, _ = script_counts(text_input)
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -3050,83 +4996,22 @@ def display_paste_analysis_results(violations, detected_language, text_input):
         st.subheader("🔍 Violated Content with AI Solutions")
         st.markdown("*Detected using hybrid analysis: keyword detection + contextual understanding*")
         
-        for i, violation in enumerate(violations, 1):
-            severity = violation.get('severity', 'low')
-            
-            # Color-coded violation display
-            if severity == 'critical':
-                st.error(f"**🔴 Violation #{i}: {violation.get('violationType', 'Unknown')}**")
-            elif severity == 'high':
-                st.warning(f"**🟠 Violation #{i}: {violation.get('violationType', 'Unknown')}**")
-            elif severity == 'medium':
-                st.info(f"**🟡 Violation #{i}: {violation.get('violationType', 'Unknown')}**")
-            else:
-                st.success(f"**🟢 Violation #{i}: {violation.get('violationType', 'Unknown')}**")
-            
-            # Show violated text with highlighting and AI solution
-            violated_text = violation.get('violationText', '')
-            ai_solution = violation.get('aiSolution', 'No solution available')
-            
-            col_a, col_b = st.columns([1, 1])
-            
-            with col_a:
-                st.markdown("**🚨 Exact Violated Text:**")
-                
-                # FIXED: Show exact violated text using st.text (preserves formatting)
-                st.text(violated_text)
-                
-                # Also show in expandable code block for copying
-                with st.expander("📋 Copy Exact Text"):
-                    st.code(violated_text, language=None)
-                
-                # Show context around the violation (optional)
-                if len(text_input) > len(violated_text):
-                    # Find the position of violated text in the input
-                    pos = text_input.find(violated_text)
-                    if pos != -1:
-                        # Show 50 characters before and after for context
-                        start = max(0, pos - 50)
-                        end = min(len(text_input), pos + len(violated_text) + 50)
-                        context = text_input[start:end]
-                        
-                        st.markdown("**📄 Context:**")
-                        # Highlight the violated text within the context using markdown
-                        highlighted_context = context.replace(violated_text, f"**{violated_text}**")
-                        st.markdown(f"...{highlighted_context}...")
-                
-                st.markdown(f"**Why this violates S&P:** {violation.get('explanation', 'N/A')}")
-            
-            with col_b:
-                st.markdown(f"**🤖 AI Solution ({detected_language}):**")
-                
-                # FIXED: Show exact Bengali solution
-                st.text(ai_solution)
-                
-                # Also show in expandable code block for copying
-                with st.expander("📋 Copy Solution"):
-                    st.code(ai_solution, language=None)
-                
-                st.markdown(f"**Suggested action:** {violation.get('suggestedAction', 'N/A')}")
-                st.markdown(f"**Severity:** {severity.upper()}")
-            
-            st.divider()
+        render_violations_table(violations)
+        
+        start, page_views = paginated_violation_views(violations, "paste_violations_page")
+        
+        positions = locate_violation_texts(text_input, [view.text for view in page_views])
+        render_violations([
+            paste_violation_html(view, i, detected_language, text_input, positions)
+            for i, view in enumerate(page_views, start + 1)
+        ], page_views)
         
         # Show severity summary
         st.subheader("📊 Violation Summary")
-        severity_counts = {}
-        for v in violations:
-            severity = v.get('severity', 'medium')
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_counts = Counter(v.get('severity', 'medium') for v in violations)
         
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("🔴 Critical", severity_counts.get('critical', 0))
-        with col2:
-            st.metric("🟠 High", severity_counts.get('high', 0))
-        with col3:
-            st.metric("🟡 Medium", severity_counts.get('medium', 0))
-        with col4:
-            st.metric("🟢 Low", severity_counts.get('low', 0))
+        for col, (severity, icon) in zip(st.columns(4), SEVERITY_ICON.items()):
+            col.metric(f"{icon} {severity.title()}", severity_counts[severity])
         
         # Generate reports for paste analysis
         st.subheader("📥 Download Reports")
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+@pytest.fixture(params=[True, False], ids=["ahocorasick", "regex"])
+def matcher_backend(request, monkeypatch):
+    if request.param and not app.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(app, "AHOCORASICK_AVAILABLE", request.param)
+
+
+def test_mixed_severity_paragraph_gets_the_highest(matcher_backend):
+    violation_map = {
+        "smoking a cigarette": {"severity": "low", "type": "Smoking"},
+        "acid attack": {"severity": "critical", "type": "Acid Attack"},
+    }
+    matched_violation = app.build_violation_matcher(violation_map)
+
+    para = "RAJ is smoking a cigarette while planning the acid attack."
+    assert violation_map[matched_violation(para)]["severity"] == "critical"
+
+
+def test_nested_violation_with_higher_severity_wins(matcher_backend):
+    violation_map = {
+        "the burning temple idol": {"severity": "medium", "type": "Religious"},
+        "temple": {"severity": "high", "type": "Footwear"},
+    }
+    matched_violation = app.build_violation_matcher(violation_map)
+
+    assert matched_violation("He walks into the burning temple idol room.") == "temple"
+
+
+def test_equal_severity_keeps_violation_order(matcher_backend):
+    violation_map = {
+        "second line": {"severity": "high", "type": "A"},
+        "first line": {"severity": "high", "type": "B"},
+    }
+    matched_violation = app.build_violation_matcher(violation_map)
+
+    assert matched_violation("first line, then second line") == "second line"
+    assert matched_violation("nothing to see here") is None